@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from .data_manager import DataManager
+
+
+class AsyncDataManager:
+    """
+    DataManager 的异步外观
+    修改在事件循环中应用到内存快照，文件锁等待与磁盘读写放到线程池执行，
+    合并其他进程的修改只在事件循环中进行；与 DataManager 的后台写入共用 io_lock 保证顺序；
+    读取方法直接转发，始终读取内存快照
+    """
+
+    def __init__(self, datamanager: DataManager):
+        """
+        Args:
+            datamanager: 被包装的同步数据管理器
+        """
+        self.sync = datamanager
+        self._lock = datamanager.io_lock
+
+    def __getattr__(self, name: str) -> Any:
+        # 读取方法与属性直接转发给同步数据管理器
+        return getattr(self.sync, name)
+
+    async def run(self, func: Callable[..., Any], *args, quiet: bool = False, **kwargs) -> Any:
+        """
+        在写锁内执行修改函数，函数产生的所有修改一次性持久化
+        
+        Args:
+            func: 修改函数，在事件循环中同步执行，文件读取与解析等耗时操作应事先在线程池中完成
+            quiet: 是否将每条修改的日志降为 debug 级别，批量导入时使用
+            
+        Returns:
+            修改函数的返回值
+        """
+        async with self._lock:
+            self.sync.begin_batch(quiet=quiet)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                ops = self.sync.end_batch()
+            
+            if ops:
+                await self.sync.persist_ops_async(ops)
+            return result
+
+    async def run_in_thread(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在写锁内于线程池中执行只读的耗时操作(如导出)，期间不会有修改发生
+        
+        Args:
+            func: 只读函数
+            
+        Returns:
+            函数的返回值
+        """
+        async with self._lock:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def add_gun(self, gun_name: str) -> bool:
+        return await self.run(self.sync.add_gun, gun_name)
+
+    async def delete_gun(self, gun_name: str) -> bool:
+        return await self.run(self.sync.delete_gun, gun_name)
+
+    async def update_gun_name(self, old_name: str, new_name: str) -> bool:
+        return await self.run(self.sync.update_gun_name, old_name, new_name)
+
+    async def add_field_data(self, gun_name: str, field_type: str, level: int,
+                             code: str, description: str, price: Optional[int] = None) -> Optional[int]:
+        op = await self.run(self.sync.add_field_op, gun_name, field_type, level, code, description, price)
+        # 持久化时序号可能因其他进程占用而顺延，以写入后的记录为准
+        return None if op is None else int(op["level"])
+
+    async def update_field_data(self, gun_name: str, field_type: str, level: int,
+                                code: Optional[str] = None, description: Optional[str] = None,
+                                price: Optional[int] = None) -> bool:
+        return await self.run(self.sync.update_field_data, gun_name, field_type, level, code, description, price)
+
+    async def delete_field_data(self, gun_name: str, field_type: str, level: int) -> bool:
+        return await self.run(self.sync.delete_field_data, gun_name, field_type, level)
+
+    async def recreate_from_template(self) -> bool:
+        """从模板重建数据，文件与数据库的重建在线程池中执行"""
+        async with self._lock:
+            return await self.sync.recreate_from_template_async()
+
+    async def close(self) -> None:
+        """等待进行中的写入完成后，合并日志(日志模式)并关闭数据管理器"""
+        async with self._lock:
+            sync = self.sync
+            if sync.journal and sync.store is None and sync.shards is None:
+                await sync.compact_async()
+            await sync.close_async()
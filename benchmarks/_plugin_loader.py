@@ -0,0 +1,87 @@
+"""
+基准测试公用的插件加载器
+
+未安装 AstrBot 时注入最小化的 astrbot.api 替身(logger、StarTools，以及加载 main 所需的
+Star/Context/filter/消息组件空实现)，再把插件目录注册为包，使相对导入可以正常工作
+"""
+import importlib
+import logging
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "yunsdf_plugin"
+
+
+def _install_astrbot_stub() -> None:
+    try:
+        import astrbot.api  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    class StarTools:
+        @staticmethod
+        def get_data_dir(name: str) -> Path:
+            path = Path(tempfile.gettempdir()) / "yunsdf_bench" / name
+            path.mkdir(parents=True, exist_ok=True)
+            return path
+
+    class Star:
+        def __init__(self, context=None):
+            self.context = context
+
+    class _Filter:
+        # filter.command(...) 等装饰器在基准测试中不做任何事
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: (lambda func: func)
+
+    class _Component:
+        def __init__(self, *args, **kwargs):
+            self.args, self.kwargs = args, kwargs
+
+        @classmethod
+        def fromBytes(cls, data: bytes):
+            return cls(data=data)
+
+    astrbot = types.ModuleType("astrbot")
+    api = types.ModuleType("astrbot.api")
+    api.logger = logging.getLogger("yunsdf_bench")
+    api.logger.addHandler(logging.NullHandler())
+    api.logger.propagate = False
+    api.AstrBotConfig = dict
+    star = types.ModuleType("astrbot.api.star")
+    star.StarTools = StarTools
+    star.Star = Star
+    star.Context = object
+    event = types.ModuleType("astrbot.api.event")
+    event.filter = _Filter()
+    event.AstrMessageEvent = object
+    event.MessageEventResult = object
+    components = types.ModuleType("astrbot.api.message_components")
+    components.Image = components.Plain = components.At = _Component
+    astrbot.api = api
+    api.star = star
+    api.event = event
+    api.message_components = components
+    sys.modules.update({
+        "astrbot": astrbot,
+        "astrbot.api": api,
+        "astrbot.api.star": star,
+        "astrbot.api.event": event,
+        "astrbot.api.message_components": components,
+    })
+
+
+def load(module: str):
+    """
+    导入插件中的模块，如 load("data_manager")
+    """
+    _install_astrbot_stub()
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PLUGIN_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{module}")
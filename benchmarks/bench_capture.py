@@ -0,0 +1,135 @@
+"""
+每日密码截图流程的离线延迟测试
+
+启动 fixture_server.py 的本地测试服务器，让插件的截图流程(含重试与熔断)访问各页面变体，
+统计冷启动(首次启动浏览器)与热启动的截图耗时、尝试次数和结果类型
+
+需要安装 Playwright 及 Chromium: pip install playwright && playwright install chromium
+
+用法:
+    python benchmarks/bench_capture.py                          # 测试全部页面变体
+    python benchmarks/bench_capture.py --variants normal slow --warm 10
+    python benchmarks/bench_capture.py --mode text              # 测试文字模式
+    python benchmarks/bench_capture.py --compare                # 比较拦截资源的快速模式与完整加载，给出每次截图节省的时间
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import _plugin_loader
+from fixture_server import VARIANTS, FixtureServer
+
+main_module = _plugin_loader.load("main")
+
+
+class BenchContext:
+    """插件构造所需的最小 Context"""
+
+    def get_config(self) -> Dict:
+        return {"admins_id": []}
+
+
+def capture_attempts(metrics) -> int:
+    """截图尝试的累计次数"""
+    return sum(h.count for h in metrics.histograms.get("capture_seconds", {}).values())
+
+
+async def run_capture(plugin) -> Dict:
+    """执行一次强制刷新的截图，返回耗时、尝试次数与结果"""
+    attempts_before = capture_attempts(plugin.metrics)
+    start = time.perf_counter()
+    try:
+        path: Optional[Path] = await plugin._get_daily_password_with_retry(force=True)
+        error = None
+    except Exception as e:
+        path, error = None, e
+    elapsed = time.perf_counter() - start
+    if error is not None:
+        result = f"error: {error}"
+    elif path is None:
+        result = "none"
+    else:
+        result = path.suffix.lstrip(".")
+    return {
+        "seconds": elapsed,
+        "attempts": capture_attempts(plugin.metrics) - attempts_before,
+        "result": result,
+    }
+
+
+async def bench_variant(server: FixtureServer, variant: str, warm: int, mode: str, block: bool = True) -> Dict:
+    """对一个页面变体测量一次冷启动和若干次热启动截图"""
+    plugin = main_module.yunsdf(BenchContext(), {
+        "daily_password_url": server.url(variant),
+        "daily_password_mode": mode,
+        "capture_block_resources": block,
+        # 测试页面的统计脚本来自 localhost
+        "capture_blocked_hosts": ["localhost"],
+        "daily_password_prewarm": False,
+        # 测量重试行为时不希望熔断器提前介入
+        "capture_failure_threshold": 1000,
+    })
+    plugin.screenshot_dir = Path(tempfile.mkdtemp(prefix=f"yunsdf_capture_{variant}_"))
+    try:
+        cold = await run_capture(plugin)
+        warm_runs: List[Dict] = [await run_capture(plugin) for _ in range(warm)]
+    finally:
+        await plugin.browser_pool.close()
+    return {"variant": variant, "block": block, "cold": cold, "warm": warm_runs}
+
+
+def warm_mean(item: Dict) -> float:
+    seconds = [run["seconds"] for run in item["warm"]]
+    return statistics.fmean(seconds) if seconds else item["cold"]["seconds"]
+
+
+def print_report(results: List[Dict], server: FixtureServer) -> None:
+    print(f"{'变体':<9} {'模式':<5} {'冷启动(s)':>10} {'热p50(s)':>10} {'热平均(s)':>10} {'尝试/次':>8} {'结果'}")
+    for item in results:
+        warm = item["warm"]
+        seconds = [run["seconds"] for run in warm] or [float("nan")]
+        attempts = [item["cold"]["attempts"]] + [run["attempts"] for run in warm]
+        outcomes = sorted({item["cold"]["result"]} | {run["result"] for run in warm})
+        print(
+            f"{item['variant']:<9} {'fast' if item['block'] else 'full':<5} "
+            f"{item['cold']['seconds']:>10.2f} {statistics.median(seconds):>10.2f} "
+            f"{statistics.fmean(seconds):>10.2f} {statistics.fmean(attempts):>8.1f} {', '.join(outcomes)}"
+        )
+    print(f"\n服务器请求数: {server.requests}")
+
+    full = {item["variant"]: item for item in results if not item["block"]}
+    fast = {item["variant"]: item for item in results if item["block"]}
+    compared = [variant for variant in fast if variant in full]
+    if compared:
+        print(f"\n{'变体':<9} {'完整加载(s)':>12} {'快速模式(s)':>12} {'每次节省(s)':>12} {'节省比例':>8}")
+        for variant in compared:
+            before, after = warm_mean(full[variant]), warm_mean(fast[variant])
+            saved = before - after
+            print(f"{variant:<9} {before:>12.2f} {after:>12.2f} {saved:>12.2f} {saved / before if before else 0:>8.1%}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--warm", type=int, default=5, help="每个变体的热启动截图次数")
+    parser.add_argument("--mode", choices=["image", "text"], default="image")
+    parser.add_argument("--compare", action="store_true", help="同时测量不拦截资源的完整加载模式")
+    parser.add_argument("--slow-delay", type=float, default=3.0)
+    parser.add_argument("--asset-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with FixtureServer(slow_delay=args.slow_delay, asset_delay=args.asset_delay) as server:
+        modes = [False, True] if args.compare else [True]
+        results = [
+            await bench_variant(server, variant, args.warm, args.mode, block)
+            for variant in args.variants for block in modes
+        ]
+        print_report(results, server)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
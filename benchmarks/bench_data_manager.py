@@ -0,0 +1,160 @@
+"""
+DataManager 热点路径的离线微基准测试
+
+生成 100 / 1万 / 10万 把枪械的合成数据，测量搜索、取代码、添加代码(含保存)、
+加载与保存的吞吐量和 p50/p99 延迟，并可保存基线用于之后的回归比较
+
+用法:
+    python benchmarks/bench_data_manager.py                     # 运行并与基线比较
+    python benchmarks/bench_data_manager.py --save-baseline     # 运行并保存基线
+    python benchmarks/bench_data_manager.py --sizes 100 10000 --codes 8
+"""
+import argparse
+import json
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import _plugin_loader
+
+data_manager = _plugin_loader.load("data_manager")
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SUFFIXES = ["突击步枪", "冲锋枪", "射手步枪", "狙击步枪", "轻机枪", "霰弹枪", "手枪"]
+
+
+def make_catalog(guns: int, codes: int, rng: random.Random) -> Dict:
+    """生成合成的枪械数据，每把枪两种模式各 codes 条改枪码"""
+    catalog = {}
+    while len(catalog) < guns:
+        prefix = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 4)))
+        name = f"{prefix}-{rng.randint(1, 99999)}{rng.choice(SUFFIXES)}"
+        catalog[name] = {
+            "name": name,
+            "firezone": {
+                str(level): {
+                    "code": f"6{rng.randrange(10 ** 17):017d}",
+                    "description": f"烽火方案{level}",
+                    "price": rng.randrange(50000, 900000),
+                }
+                for level in range(1, codes + 1)
+            },
+            "battlefield": {
+                str(level): {"code": f"6{rng.randrange(10 ** 17):017d}", "description": f"战场方案{level}"}
+                for level in range(1, codes + 1)
+            },
+        }
+    return {"guns": catalog}
+
+
+def measure(fn: Callable[[int], None], min_runs: int, budget: float) -> Dict[str, float]:
+    """
+    重复执行 fn 直到达到最少次数且超出时间预算，返回吞吐量与延迟分位数
+    """
+    samples: List[float] = []
+    started = time.perf_counter()
+    i = 0
+    while i < min_runs or (time.perf_counter() - started < budget and i < 1_000_000):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+        i += 1
+    samples.sort()
+    total = sum(samples)
+    return {
+        "runs": len(samples),
+        "ops_per_sec": len(samples) / total if total > 0 else float("inf"),
+        "p50_us": statistics.median(samples) * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def bench_size(guns: int, codes: int, budget: float) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(guns)
+    catalog = make_catalog(guns, codes, rng)
+    names = list(catalog["guns"])
+    keywords = []
+    for _ in range(1000):
+        name = rng.choice(names).lower()
+        start = rng.randint(0, len(name) - 3)
+        keywords.append(name[start:start + rng.randint(2, 5)])
+    lookups = [rng.choice(names) for _ in range(1000)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "gun_data.json"
+        data_file.write_text(json.dumps(catalog, ensure_ascii=False, indent=4), encoding="utf-8")
+        dm = data_manager.DataManager(data_file)
+
+        results["search_guns"] = measure(lambda i: dm.search_guns(keywords[i % len(keywords)]), 200, budget)
+        results["get_gun_codes_price"] = measure(
+            lambda i: dm.get_gun_codes(lookups[i % len(lookups)], "firezone", sort_by_price=True), 200, budget
+        )
+        results["get_gun_codes_level"] = measure(
+            lambda i: dm.get_gun_codes(lookups[i % len(lookups)], "battlefield"), 200, budget
+        )
+        results["add_field_data_save"] = measure(
+            lambda i: dm.add_field_data(lookups[i % len(lookups)], "battlefield", 1000 + i, "6" * 18, "基准"),
+            3, budget
+        )
+        results["load_data"] = measure(lambda i: dm._load_data(), 3, budget)
+        results["save_data"] = measure(lambda i: dm._save_data(), 3, budget)
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """与基线比较 p50，超过阈值的视为回归"""
+    regressions = []
+    for size, ops in current.items():
+        for op, stats in ops.items():
+            base = baseline.get(size, {}).get(op)
+            if not base:
+                continue
+            ratio = stats["p50_us"] / base["p50_us"] if base["p50_us"] else 1.0
+            if ratio > 1 + threshold:
+                regressions.append(f"{size:>7} {op:<22} p50 {base['p50_us']:.1f} -> {stats['p50_us']:.1f} us ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000], help="枪械数量")
+    parser.add_argument("--codes", type=int, default=6, help="每把枪每种模式的改枪码数量")
+    parser.add_argument("--budget", type=float, default=1.0, help="每项测试的时间预算(秒)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.25, help="p50 变慢超过该比例视为回归")
+    args = parser.parse_args()
+
+    current = {}
+    print(f"{'枪械数':>7} {'操作':<22} {'次数':>7} {'ops/s':>12} {'p50(us)':>12} {'p99(us)':>12}")
+    for size in args.sizes:
+        current[str(size)] = bench_size(size, args.codes, args.budget)
+        for op, stats in current[str(size)].items():
+            print(
+                f"{size:>7} {op:<22} {stats['runs']:>7} {stats['ops_per_sec']:>12,.1f} "
+                f"{stats['p50_us']:>12,.1f} {stats['p99_us']:>12,.1f}"
+            )
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"\n基线已保存到 {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        regressions = compare(current, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print(f"\n⚠️ 发现 {len(regressions)} 项性能回归 (阈值 {args.threshold:.0%}):")
+            print("\n".join(regressions))
+            return 1
+        print("\n与基线相比未发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
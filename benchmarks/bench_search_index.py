@@ -0,0 +1,88 @@
+"""
+枪名搜索基准测试：对比逐个子串扫描与 n-gram 倒排索引，并测量容错搜索延迟
+
+用法: python benchmarks/bench_search_index.py [枪械数量...]
+"""
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import GunSearchIndex  # noqa: E402
+
+SUFFIXES = ["突击步枪", "冲锋枪", "射手步枪", "狙击步枪", "轻机枪", "霰弹枪", "手枪"]
+
+
+def make_names(count: int, rng: random.Random) -> list:
+    """生成形如 'AKM-1234突击步枪' 的合成枪名"""
+    names = set()
+    while len(names) < count:
+        prefix = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 4)))
+        names.add(f"{prefix}-{rng.randint(1, 9999)}{rng.choice(SUFFIXES)}")
+    return list(names)
+
+
+def linear_search(names: list, keyword: str) -> list:
+    keyword_lower = keyword.lower()
+    return [name for name in names if keyword_lower in name.lower()]
+
+
+def make_typo(keyword: str, rng: random.Random) -> str:
+    """随机替换、删除或插入一个字符"""
+    i = rng.randrange(len(keyword))
+    kind = rng.randrange(3)
+    if kind == 0:
+        return keyword[:i] + rng.choice(string.ascii_lowercase) + keyword[i + 1:]
+    if kind == 1 and len(keyword) > 3:
+        return keyword[:i] + keyword[i + 1:]
+    return keyword[:i] + rng.choice(string.digits) + keyword[i:]
+
+
+def bench(count: int, queries: int = 2000) -> None:
+    rng = random.Random(count)
+    names = make_names(count, rng)
+    keywords = []
+    for _ in range(queries):
+        name = rng.choice(names).lower()
+        start = rng.randint(0, len(name) - 3)
+        keywords.append(name[start:start + rng.randint(2, 6)])
+
+    build_start = time.perf_counter()
+    index = GunSearchIndex(names)
+    build_time = time.perf_counter() - build_start
+
+    start = time.perf_counter()
+    expected = [linear_search(names, kw) for kw in keywords]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [index.search(kw) for kw in keywords]
+    index_time = time.perf_counter() - start
+
+    assert actual == expected, "索引结果与子串扫描不一致"
+
+    # 取枪名的字母和数字部分并制造一处拼写错误，如 "akm-1234" -> "akn12"
+    typos = [make_typo(name.lower().replace("-", "")[:6], rng) for name in rng.sample(names, min(500, count))]
+    fuzzy_times = []
+    for kw in typos:
+        start = time.perf_counter()
+        index.fuzzy_search(kw)
+        fuzzy_times.append(time.perf_counter() - start)
+    fuzzy_times.sort()
+    print(
+        f"{count:>7} 个枪名 | 建索引 {build_time * 1000:8.1f} ms | "
+        f"扫描 {linear_time / queries * 1e6:9.1f} us/次 | "
+        f"索引 {index_time / queries * 1e6:8.1f} us/次 | "
+        f"加速 {linear_time / index_time:6.1f}x | "
+        f"容错 p50 {fuzzy_times[len(fuzzy_times) // 2] * 1000:5.2f} ms "
+        f"p99 {fuzzy_times[int(len(fuzzy_times) * 0.99)] * 1000:5.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        bench(size)
@@ -0,0 +1,183 @@
+"""
+每日密码页面的本地测试服务器：提供 fixtures/ 下保存的 /sjz/ 页面及其多个变体，
+用于离线测量与回归测试截图流程
+
+页面变体(路径前缀):
+    /sjz/          正常页面，含图片、字体和第三方统计脚本
+    /slow/sjz/     页面响应延迟 --slow-delay 秒
+    /missing/sjz/  页面中没有每日密码区域
+    /broken/sjz/   不返回任何内容直接断开连接
+    /flaky/sjz/    每个奇数次请求断开连接，偶数次返回正常页面，用于观察重试
+
+统计脚本从 localhost 加载(页面本身使用 127.0.0.1)，模拟来自其他域名的请求
+
+用法: python benchmarks/fixture_server.py [--port 8765] [--slow-delay 3] [--asset-delay 0.3]
+"""
+import argparse
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+VARIANTS = ("normal", "slow", "missing", "broken", "flaky")
+
+# 静态资源: 路径 -> (Content-Type, 字节数)
+ASSETS = {
+    "/static/banner.jpg": ("image/jpeg", 300 * 1024),
+    "/static/font.woff2": ("font/woff2", 80 * 1024),
+    **{f"/static/map{i}.jpg": ("image/jpeg", 120 * 1024) for i in range(1, 6)},
+}
+
+ANALYTICS_JS = """
+(function () {
+  var n = 0;
+  function ping() {
+    new Image().src = "%s/analytics/beacon?n=" + n + "&t=" + Date.now();
+    if (++n < 5) setTimeout(ping, 300);
+  }
+  ping();
+})();
+"""
+
+
+class FixtureServer:
+    """在后台线程中运行的测试服务器"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 slow_delay: float = 3.0, asset_delay: float = 0.3):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+            slow_delay: slow 变体的页面响应延迟(秒)
+            asset_delay: 每个静态资源和统计请求的响应延迟(秒)
+        """
+        self.slow_delay = slow_delay
+        self.asset_delay = asset_delay
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._assets = {path: os.urandom(size) for path, (_, size) in ASSETS.items()}
+        self._page = (FIXTURES_DIR / "sjz.html").read_text(encoding="utf-8")
+        self._stats = (FIXTURES_DIR / "stats.html").read_text(encoding="utf-8")
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def url(self, variant: str = "normal") -> str:
+        """获取页面变体的地址"""
+        prefix = "" if variant == "normal" else f"/{variant}"
+        return f"http://127.0.0.1:{self.port}{prefix}/sjz/"
+
+    def render_page(self, variant: str) -> bytes:
+        """生成页面变体的 HTML"""
+        page = self._page.replace("{{ANALYTICS_ORIGIN}}", f"http://localhost:{self.port}")
+        if variant == "missing":
+            page = re.sub(r"<!--BLOCK-->.*<!--/BLOCK-->", "<p>密码数据维护中</p>", page, flags=re.S)
+        else:
+            page = page.replace("<!--STATS-->", self._stats)
+        return page.encode("utf-8")
+
+    def count(self, kind: str) -> int:
+        """记录并返回某类请求的次数"""
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            return self.requests[kind]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, content_type: str, body: bytes, status: int = 200) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                match = re.fullmatch(r"(?:/(\w+))?/sjz/?", path)
+                if match:
+                    variant = match.group(1) or "normal"
+                    if variant not in VARIANTS:
+                        self._send("text/plain", b"not found", 404)
+                        return
+                    number = server.count(f"page:{variant}")
+                    if variant == "broken" or (variant == "flaky" and number % 2 == 1):
+                        self.close_connection = True
+                        return
+                    if variant == "slow":
+                        time.sleep(server.slow_delay)
+                    self._send("text/html; charset=utf-8", server.render_page(variant))
+                elif path in ASSETS:
+                    server.count("asset")
+                    time.sleep(server.asset_delay)
+                    self._send(ASSETS[path][0], server._assets[path])
+                elif path == "/analytics/collect.js":
+                    server.count("analytics")
+                    time.sleep(server.asset_delay)
+                    body = ANALYTICS_JS % f"http://localhost:{server.port}"
+                    self._send("application/javascript", body.encode("utf-8"))
+                elif path == "/analytics/beacon":
+                    server.count("analytics")
+                    time.sleep(server.asset_delay)
+                    self._send("image/gif", b"GIF89a\x01\x00\x01\x00\x00\x00\x00;")
+                else:
+                    self._send("text/plain", b"not found", 404)
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        """在后台线程中启动"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """在当前线程中运行，直到被中断"""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """停止后台线程中的服务器"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--slow-delay", type=float, default=3.0)
+    parser.add_argument("--asset-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, slow_delay=args.slow_delay, asset_delay=args.asset_delay)
+    for variant in VARIANTS:
+        print(f"{variant:>8}: {server.url(variant)}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from astrbot.api import logger
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+
+class BrowserPool:
+    """
+    常驻的 Chromium 浏览器池
+    首次使用时才导入 Playwright 并启动浏览器，之后复用同一个浏览器和上下文，
+    打开的页面数达到上限或浏览器崩溃时自动重建
+    """
+
+    LAUNCH_ARGS = [
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-gpu',
+        '--lang=zh-CN'
+    ]
+
+    CONTEXT_OPTIONS = {
+        'locale': 'zh-CN',
+        'timezone_id': 'Asia/Shanghai',
+        'viewport': {'width': 1200, 'height': 800},
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+        'ignore_https_errors': True,
+    }
+
+    def __init__(self, max_pages: int = 50, launch_timeout_ms: int = 30000):
+        """
+        初始化浏览器池
+        
+        Args:
+            max_pages: 浏览器累计打开多少个页面后重建
+            launch_timeout_ms: 启动浏览器的超时时间(毫秒)
+        """
+        self.max_pages = max(1, max_pages)
+        self.launch_timeout_ms = launch_timeout_ms
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._context: Optional["BrowserContext"] = None
+        # 首次启动浏览器的耗时(秒)，包括导入 Playwright
+        self.first_start_seconds: Optional[float] = None
+        self._pages_served = 0
+        self._active_pages = 0
+        self._recycle_pending = False
+        self._lock = asyncio.Lock()
+
+    def _is_healthy(self) -> bool:
+        """检查浏览器是否仍可用"""
+        return (
+            self._browser is not None
+            and self._context is not None
+            and self._browser.is_connected()
+        )
+
+    async def _start(self) -> None:
+        """启动浏览器并创建上下文，首次调用时才导入 Playwright"""
+        started = time.perf_counter()
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        
+        self._browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=self.LAUNCH_ARGS,
+            timeout=self.launch_timeout_ms
+        )
+        self._context = await self._browser.new_context(**self.CONTEXT_OPTIONS)
+        self._pages_served = 0
+        self._recycle_pending = False
+        elapsed = time.perf_counter() - started
+        if self.first_start_seconds is None:
+            self.first_start_seconds = elapsed
+        logger.info(f"常驻浏览器已启动，耗时 {elapsed:.2f} 秒")
+
+    async def _close_browser(self) -> None:
+        """关闭浏览器和上下文，保留 Playwright 驱动进程"""
+        context, browser = self._context, self._browser
+        self._context = None
+        self._browser = None
+        
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器上下文时发生错误: {e}")
+        if browser is not None:
+            try:
+                await browser.close()
+                logger.info("浏览器已关闭")
+            except Exception as e:
+                logger.warning(f"关闭浏览器时发生错误: {e}")
+
+    async def _acquire_context(self) -> "BrowserContext":
+        """获取可用的浏览器上下文，必要时启动或重建浏览器"""
+        async with self._lock:
+            if self._browser is not None and not self._is_healthy():
+                logger.warning("常驻浏览器已断开，正在重建")
+                await self._close_browser()
+            elif self._recycle_pending and self._active_pages == 0:
+                logger.info(f"浏览器已服务 {self._pages_served} 个页面，正在回收重建")
+                await self._close_browser()
+            
+            if self._browser is None:
+                await self._start()
+            
+            self._pages_served += 1
+            self._active_pages += 1
+            if self._pages_served >= self.max_pages:
+                self._recycle_pending = True
+            return self._context
+
+    @asynccontextmanager
+    async def page(self, timeout_ms: int = 30000) -> AsyncIterator["Page"]:
+        """
+        从常驻浏览器中打开一个新页面，退出时关闭页面
+        
+        Args:
+            timeout_ms: 页面默认超时时间(毫秒)
+        """
+        context = await self._acquire_context()
+        page = None
+        try:
+            page = await context.new_page()
+            page.set_default_timeout(timeout_ms)
+            page.set_default_navigation_timeout(timeout_ms)
+            yield page
+        finally:
+            self._active_pages -= 1
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.warning(f"关闭页面时发生错误: {e}")
+            if not self._is_healthy():
+                # 浏览器崩溃，下次使用时重建
+                self._recycle_pending = True
+
+    async def close(self) -> None:
+        """关闭浏览器并停止 Playwright"""
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.warning(f"停止 Playwright 时发生错误: {e}")
+                self._playwright = None
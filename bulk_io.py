@@ -0,0 +1,276 @@
+from astrbot.api import logger
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .data_manager import DataManager
+
+# 导入时接受的字段类型写法
+FIELD_ALIASES = {
+    "烽火地带": "firezone",
+    "firezone": "firezone",
+    "全面战场": "battlefield",
+    "battlefield": "battlefield",
+}
+
+FIELD_NAMES_CN = {
+    "firezone": "烽火地带",
+    "battlefield": "全面战场",
+}
+
+CSV_COLUMNS = ["gun", "field", "level", "code", "description", "price"]
+
+SUPPORTED_SUFFIXES = (".jsonl", ".ndjson", ".csv")
+
+
+class ImportReport:
+    """批量导入的校验与统计结果"""
+
+    # 报告中最多保留的错误条数
+    MAX_ERRORS = 20
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.guns_created = 0
+        self.elapsed = 0.0
+        self.errors: List[Tuple[int, str]] = []
+
+    def add_error(self, line_no: int, reason: str) -> None:
+        """记录一行校验失败"""
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line_no, reason))
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def render(self) -> str:
+        """渲染为回复文本"""
+        result = (
+            f"✅导入完成: {self.file_name}\n"
+            f"• 总行数: {self.total}，成功: {self.imported}，失败: {self.failed}\n"
+            f"• 新增枪械: {self.guns_created}\n"
+            f"• 耗时: {self.elapsed:.2f}秒 ({self.rows_per_second:.0f} 行/秒)"
+        )
+        if self.errors:
+            result += "\n❌错误示例:"
+            for line_no, reason in self.errors:
+                result += f"\n  第 {line_no} 行: {reason}"
+            if self.failed > len(self.errors):
+                result += f"\n  ……另有 {self.failed - len(self.errors)} 行错误未列出"
+        return result
+
+
+def iter_rows(path: Path) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    逐行读取 JSON Lines 或 CSV 文件，不会一次性读入整个文件
+    
+    Args:
+        path: 文件路径
+        
+    Yields:
+        (行号, 行数据, 解析错误)
+    """
+    with path.open('r', encoding='utf-8-sig', newline='') as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row, None
+            return
+        
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"JSON 格式错误: {e.msg}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "每行必须是一个 JSON 对象"
+                continue
+            yield line_no, row, None
+
+
+def _parse_optional_int(value, name: str) -> Optional[int]:
+    """将可选的整数字段转换为 int，空值返回 None"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} 必须是整数: {value!r}")
+
+
+def validate_row(row: Dict) -> Tuple[str, str, Optional[int], str, str, Optional[int]]:
+    """
+    校验并规范化一行改枪码数据
+    
+    Args:
+        row: 原始行数据
+        
+    Returns:
+        (枪名, 字段类型, 序号, 代码, 描述, 价格)
+    """
+    gun_name = str(row.get("gun") or "").strip()
+    if not gun_name:
+        raise ValueError("缺少枪械名称 gun")
+    
+    field_type = FIELD_ALIASES.get(str(row.get("field") or "").strip())
+    if field_type is None:
+        raise ValueError(f"字段类型必须是 '烽火地带' 或 '全面战场': {row.get('field')!r}")
+    
+    code = str(row.get("code") or "").strip()
+    if not code:
+        raise ValueError("缺少代码 code")
+    
+    description = str(row.get("description") or "").strip()
+    level = _parse_optional_int(row.get("level"), "序号 level")
+    if level is not None and level < 1:
+        raise ValueError(f"序号 level 必须大于 0: {level}")
+    
+    price = _parse_optional_int(row.get("price"), "价格 price")
+    if field_type == "firezone" and price is None:
+        raise ValueError("烽火地带类型必须提供价格 price")
+    
+    return gun_name, field_type, level, code, description, price
+
+
+def parse_codes(path: Path) -> Tuple[ImportReport, List[Tuple[int, Tuple]]]:
+    """
+    流式读取并校验改枪码文件，不修改数据，可在线程池中执行
+    
+    Args:
+        path: JSON Lines 或 CSV 文件路径
+        
+    Returns:
+        (记录了解析错误的导入报告, [(行号, validate_row 的结果), ...])
+    """
+    report = ImportReport(path.name)
+    start = time.perf_counter()
+    rows = []
+    for line_no, row, error in iter_rows(path):
+        report.total += 1
+        if error is not None:
+            report.add_error(line_no, error)
+            continue
+        
+        try:
+            rows.append((line_no, validate_row(row)))
+        except ValueError as e:
+            report.add_error(line_no, str(e))
+    
+    report.elapsed = time.perf_counter() - start
+    return report, rows
+
+
+def apply_codes(datamanager: DataManager, report: ImportReport, rows: List[Tuple[int, Tuple]],
+                create_guns: bool = True) -> ImportReport:
+    """
+    将 parse_codes 校验通过的行写入数据，全部修改在一个批次中完成，只保存一次
+    
+    Args:
+        datamanager: 数据管理器
+        report: parse_codes 返回的导入报告
+        rows: parse_codes 返回的已校验行
+        create_guns: 枪械不存在时是否自动添加
+        
+    Returns:
+        导入报告
+    """
+    start = time.perf_counter()
+    
+    with datamanager.batch():
+        for line_no, (gun_name, field_type, level, code, description, price) in rows:
+            if not datamanager.gun_exists(gun_name):
+                if not create_guns:
+                    report.add_error(line_no, f"枪械 '{gun_name}' 不存在")
+                    continue
+                datamanager.add_gun(gun_name)
+                report.guns_created += 1
+            
+            if level is None:
+                level = datamanager.next_level(gun_name, field_type)
+            
+            if datamanager.add_field_data(gun_name, field_type, level, code, description, price) is not None:
+                report.imported += 1
+            else:
+                report.add_error(line_no, "写入失败")
+    
+    report.elapsed += time.perf_counter() - start
+    logger.info(
+        f"导入 {report.file_name}: {report.imported}/{report.total} 行成功，"
+        f"耗时 {report.elapsed:.2f}秒 ({report.rows_per_second:.0f} 行/秒)"
+    )
+    return report
+
+
+def import_codes(datamanager: DataManager, path: Path, create_guns: bool = True) -> ImportReport:
+    """
+    流式导入改枪码，全部修改在一个批次中完成，只保存一次
+    
+    Args:
+        datamanager: 数据管理器
+        path: JSON Lines 或 CSV 文件路径
+        create_guns: 枪械不存在时是否自动添加
+        
+    Returns:
+        导入报告
+    """
+    report, rows = parse_codes(path)
+    return apply_codes(datamanager, report, rows, create_guns)
+
+
+def export_codes(datamanager: DataManager, path: Path) -> Tuple[int, float]:
+    """
+    流式导出全部改枪码为 JSON Lines 或 CSV
+    
+    Args:
+        datamanager: 数据管理器
+        path: 导出文件路径，按后缀决定格式
+        
+    Returns:
+        (导出行数, 耗时秒数)
+    """
+    start = time.perf_counter()
+    count = 0
+    is_csv = path.suffix.lower() == ".csv"
+    tmp_path = path.with_name(path.name + ".tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with tmp_path.open('w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS) if is_csv else None
+        if writer is not None:
+            writer.writeheader()
+        
+        for gun_name in datamanager.get_gun_list():
+            for field_type, field_cn in FIELD_NAMES_CN.items():
+                field_data = datamanager.get_gun_field_data(gun_name, field_type) or {}
+                # 直接遍历字段数据，避免为每把枪生成并缓存排序视图
+                for level in sorted(field_data, key=int):
+                    data = field_data[level]
+                    row = {
+                        "gun": gun_name,
+                        "field": field_cn,
+                        "level": int(level),
+                        "code": data.get("code", ""),
+                        "description": data.get("description", ""),
+                        "price": data.get("price"),
+                    }
+                    if writer is not None:
+                        writer.writerow(row)
+                    else:
+                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    count += 1
+    
+    tmp_path.replace(path)
+    elapsed = time.perf_counter() - start
+    logger.info(f"已导出 {count} 条改枪码到 {path}，耗时 {elapsed:.2f}秒")
+    return count, elapsed
@@ -0,0 +1,175 @@
+from astrbot.api import logger
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.async_api import ElementHandle, Page, Route
+
+
+async def wait_for_first_selector(page: "Page", selectors: Sequence[str], timeout_ms: int = 10000,
+                                  state: str = "visible") -> Tuple[Optional[str], Optional["ElementHandle"]]:
+    """
+    同时等待所有候选选择器，返回最先出现的元素
+    多个选择器同时出现时按列表中的顺序优先
+
+    Args:
+        page: 页面
+        selectors: 候选选择器，按优先级排列
+        timeout_ms: 等待的总超时时间(毫秒)
+        state: 元素需要达到的状态
+
+    Returns:
+        (命中的选择器, 元素)，全部失败时返回 (None, None)
+    """
+    tasks = {
+        asyncio.ensure_future(page.wait_for_selector(selector, timeout=timeout_ms, state=state)): selector
+        for selector in selectors
+    }
+    priority = {selector: i for i, selector in enumerate(selectors)}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: priority[tasks[t]]):
+                if task.exception() is not None:
+                    logger.debug(f"选择器 {tasks[task]} 失败: {task.exception()}")
+                elif task.result() is not None:
+                    return tasks[task], task.result()
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class CircuitBreaker:
+    """
+    获取失败的熔断器
+    连续失败达到阈值后熔断，冷却期内不再访问网站；
+    冷却结束后放行一次试探，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 600):
+        """
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断后的冷却时间(秒)
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = max(0.0, cooldown)
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """熔断器状态: closed、open 或 half_open"""
+        if self._opened_at is None:
+            return "closed"
+        return "open" if self.remaining() > 0 else "half_open"
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断冷却期"""
+        return self.state == "open"
+
+    def remaining(self) -> float:
+        """距离冷却结束的秒数"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """是否允许访问网站，冷却结束后允许试探"""
+        return not self.is_open
+
+    def record_success(self) -> None:
+        """记录一次成功，恢复正常状态"""
+        if self._opened_at is not None:
+            logger.info("每日密码获取已恢复，熔断器关闭")
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """记录一次失败，达到阈值或试探失败时熔断"""
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(f"每日密码连续获取失败 {self.failures} 次，熔断 {self.cooldown:.0f} 秒")
+
+
+class RequestBlocker:
+    """
+    截图页面的请求拦截
+    只拦截统计、广告等跟踪域名的请求以及音视频媒体，页面自身及 CDN 上的样式、脚本、图片和字体照常加载
+    """
+
+    # 常见的统计与广告域名，匹配域名本身及其子域名
+    TRACKER_HOSTS = frozenset({
+        "google-analytics.com", "googletagmanager.com", "googlesyndication.com",
+        "googleadservices.com", "doubleclick.net", "adservice.google.com",
+        "hm.baidu.com", "pos.baidu.com", "cpro.baidustatic.com",
+        "cnzz.com", "umeng.com", "51.la", "growingio.com", "sensorsdata.cn",
+        "clarity.ms", "hotjar.com", "connect.facebook.net", "analytics.tiktok.com",
+    })
+    BLOCKED_RESOURCE_TYPES = frozenset({"media"})
+
+    def __init__(self, extra_hosts: Iterable[str] = ()):
+        """
+        Args:
+            extra_hosts: 额外需要拦截的域名，同样匹配其子域名
+        """
+        self.hosts = self.TRACKER_HOSTS | {host.strip().lower().lstrip(".") for host in extra_hosts if host.strip()}
+        self.blocked: Dict[str, int] = {}
+
+    @property
+    def total(self) -> int:
+        """已拦截的请求数"""
+        return sum(self.blocked.values())
+
+    def _is_tracker(self, host: str) -> bool:
+        # 依次检查 a.b.example.com、b.example.com、example.com、com
+        labels = host.split(".")
+        return any(".".join(labels[i:]) in self.hosts for i in range(len(labels)))
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """
+        判断请求是否需要拦截
+        
+        Returns:
+            拦截原因(media 或 tracker)，不拦截时返回None
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or resource_type == "document":
+            return None
+        if resource_type in self.BLOCKED_RESOURCE_TYPES:
+            return resource_type
+        if self._is_tracker((parts.hostname or "").lower()):
+            return "tracker"
+        return None
+
+    async def install(self, page: "Page") -> None:
+        """在页面上注册拦截规则，需在导航前调用"""
+        await page.route("**/*", self._handle)
+
+    async def _handle(self, route: "Route") -> None:
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        try:
+            if reason is None:
+                await route.continue_()
+            else:
+                self.blocked[reason] = self.blocked.get(reason, 0) + 1
+                await route.abort()
+        except Exception as e:
+            # 页面关闭后仍可能有请求到达
+            logger.debug(f"处理请求 {request.url} 时发生错误: {e}")
+
+    def summary(self) -> str:
+        """拦截统计的简要描述"""
+        names = {"media": "媒体", "tracker": "统计/广告"}
+        detail = " ".join(f"{names.get(k, k)}{v}" for k, v in sorted(self.blocked.items()))
+        return f"拦截 {self.total} 个请求" + (f"({detail})" if detail else "")
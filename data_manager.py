@@ -1,60 +1,809 @@
 from astrbot.api.star import StarTools
 from astrbot.api import logger
+import asyncio
 import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Union, Tuple
+
+from .search_index import GunSearchIndex
+from .sqlite_store import SqliteStore
+from .sharded_store import ShardedStore
+from .file_lock import FileLock
+from .file_watcher import FileWatcher
+from .pagination import VersionedCache
 
 class DataManager:
     """
     数据管理器类，负责改枪码的存储与管理
     使用 JSON 文件进行持久化存储
+
+    开启日志模式后，每次修改只向日志文件追加一条紧凑记录，
+    日志条数达到阈值时再合并回完整的数据文件，加载时会重放日志
+
+    开启延迟写入后，修改只会标记数据为脏，由后台任务合并后统一写入，
+    所有写入均采用临时文件 + fsync + 重命名的原子方式
+
+    使用 sqlite 后端时，数据保存在同名的 .db 文件中，每次修改只执行对应的 SQL 语句，
+    首次启动时会自动从现有的 JSON 数据文件或模板迁移
+
+    使用 sharded 后端时，数据按枪名分散保存在 <数据文件名>_shards 目录下，
+    启动时只读取枪名索引，枪械数据在访问时按分片加载
+
+    使用 json 后端时，写入数据文件或日志前会获取 <数据文件名>.lock 文件锁，
+    并检查文件是否已被其他进程修改，若已修改则重新加载并在其上重放本地尚未保存的修改；
+    异步接口(persist_ops_async 等)在线程池中等待文件锁和读写磁盘，替换内存数据只在事件循环中进行；
+    读取始终使用内存中的数据，不获取锁；
+    start_watcher 启动后，数据文件被外部修改时会自动重新加载，并只更新发生变化的枪械的索引与缓存
     """
 
-    def __init__(self, data_file: Union[str, Path] = StarTools.get_data_dir("yunsdf")/"gun_data.json"):
+    # 后台写入失败后重试的最长间隔(秒)
+    FLUSH_RETRY_MAX_DELAY = 60.0
+    # 内存中最多缓存的排序视图数，每把枪最多 4 个
+    SORTED_VIEW_CACHE_SIZE = 256
+
+    def __init__(self, data_file: Union[str, Path] = StarTools.get_data_dir("yunsdf")/"gun_data.json",
+                 journal: bool = False, compact_threshold: int = 500,
+                 deferred_save: bool = False, flush_delay: float = 2.0,
+                 backend: str = "json", shard_cache_size: int = 32):
         """
         初始化数据管理器
         
         Args:
             data_file: 数据文件路径
+            journal: 是否启用追加日志模式
+            compact_threshold: 日志记录达到多少条后合并回数据文件
+            deferred_save: 是否启用后台延迟写入
+            flush_delay: 延迟写入的等待秒数，期间的修改会合并为一次写入
+            backend: 存储后端，'json'、'sqlite' 或 'sharded'
+            shard_cache_size: 分片后端在内存中缓存的分片数
         """
         self.data_file = Path(data_file)
+        self.journal_file = self.data_file.with_suffix(".journal")
+        self.journal = journal
+        self.compact_threshold = max(1, compact_threshold)
+        self._journal_count = 0
+        self.deferred_save = deferred_save
+        self.flush_delay = max(0.0, flush_delay)
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self._save_seq = 0
+        self._written_seq = 0
+        # 排序视图按枪械版本号缓存，容量有限，避免分片后端淘汰的分片仍被视图引用而常驻内存
+        self._sorted_views = VersionedCache(max_entries=self.SORTED_VIEW_CACHE_SIZE)
+        self._gun_versions: Dict[str, int] = {}
+        self._version_seq = 0
+        self._next_levels: Dict[Tuple[str, str], int] = {}
+        # 有序枪名索引及其版本号，枪械增删改名时失效
+        self._gun_order: Optional[List[str]] = None
+        self.catalog_version = 0
+        self._batch_ops: Optional[List[Dict]] = None
+        self._batch_depth = 0
+        self._batch_quiet = True
+        # 尚未写入磁盘的修改记录，其他进程修改了文件时用于合并
+        self._unsaved_ops: List[Dict] = []
+        # 最近一次读取或写入后数据文件与日志文件的状态
+        self._disk_sig: Optional[Tuple] = None
+        self._file_lock = FileLock(self.data_file.with_suffix(".lock"))
+        # 事件循环中修改、写入与合并共用的锁，AsyncDataManager 使用同一把锁
+        self.io_lock = asyncio.Lock()
+        self._watcher: Optional[FileWatcher] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._unparsable_sig: Optional[Tuple] = None
+        self.search_index: Optional[GunSearchIndex] = None
+        # 每次完整保存后以耗时(秒)回调，用于统计保存耗时
+        self.save_observer: Optional[Callable[[float], None]] = None
+        self.store: Optional[SqliteStore] = None
+        self.shards: Optional[ShardedStore] = None
+        if backend == "sqlite":
+            self.store = SqliteStore(self.data_file.with_suffix(".db"))
+        elif backend == "sharded":
+            self.shards = ShardedStore(
+                self.data_file.parent / f"{self.data_file.stem}_shards", cache_size=shard_cache_size
+            )
+            logger.info("sharded 后端不使用文件锁与数据文件监视，不支持多个实例同时写入")
+        if backend != "json":
+            ignored = [name for name, enabled in (("storage_journal", journal), ("deferred_save", deferred_save)) if enabled]
+            if ignored:
+                logger.warning(f"{backend} 后端每次修改立即写入，已忽略选项: {', '.join(ignored)}")
+        started = time.perf_counter()
         self.data = self._load_data()
         self._ensure_data_structure()
+        loaded = time.perf_counter()
+        self._rebuild_indexes()
+        # 启动各阶段耗时(秒)，用于启动耗时报告
+        self.load_timings: Dict[str, float] = {
+            "load": loaded - started,
+            "index": time.perf_counter() - loaded,
+        }
     
     def _ensure_data_structure(self):
-        """确保数据结构正确"""
-        if "guns" not in self.data:
+        """确保数据结构正确，仅在数据被修正或重放过日志时写回文件"""
+        changed = "guns" not in self.data
+        if changed:
             self.data["guns"] = {}
-        self._save_data()
+        if self.store is None and self.shards is None and (changed or self._journal_count):
+            self._save_data()
     
     def _load_data(self) -> Dict:
         """
         从文件加载数据，如果数据文件不存在则尝试从模板创建
+        存在日志文件时，会在数据文件的基础上重放日志
         
         Returns:
             加载的数据字典
         """
+        if self.store is not None:
+            return self._load_from_store()
+        if self.shards is not None:
+            return self._load_from_shards()
+        
+        # 先记录文件状态再读取，读取期间文件被修改时下次写入前会重新合并
+        self._disk_sig = self._disk_signature()
         if self.data_file.exists():
+            data = self._read_data_file()
+        else:
+            with self._file_lock:
+                if self.data_file.exists():
+                    data = self._read_data_file()
+                else:
+                    # 数据文件不存在，尝试从模板文件创建
+                    data = self._create_from_template()
+            self._disk_sig = self._disk_signature()
+        
+        self._journal_count = self._replay_journal(data)
+        return data
+
+    def _read_data_file(self, backup_corrupt: bool = True) -> Optional[Dict]:
+        """
+        读取数据文件
+        
+        Args:
+            backup_corrupt: 文件损坏时是否备份并返回空数据，否则返回None
+            
+        Returns:
+            数据字典
+        """
+        try:
+            with self.data_file.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            if not backup_corrupt:
+                # 文件可能正在被手动编辑，等待下一次变化
+                logger.warning(f"数据文件暂时无法解析，保留当前数据: {e}")
+                return None
+            logger.error(f"加载数据文件失败: {e}")
+            self._backup_corrupt_file()
+            return {}
+
+    def _disk_signature(self) -> Tuple:
+        """
+        数据文件与日志文件的当前状态，用于判断是否被其他进程修改
+        
+        Returns:
+            (数据文件的 inode、修改时间与大小, 日志文件大小)
+        """
+        try:
+            stat = self.data_file.stat()
+            data_sig = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            data_sig = None
+        try:
+            journal_size = self.journal_file.stat().st_size
+        except OSError:
+            journal_size = 0
+        return data_sig, journal_size
+
+    def _read_disk_if_changed(self, known_sig: Optional[Tuple],
+                              backup_corrupt: bool) -> Optional[Tuple[Tuple, Optional[Dict], int]]:
+        """
+        持有文件锁检查数据文件与日志是否已被其他进程修改，若已修改则读取并重放日志
+        只读写磁盘，不修改内存数据，可在线程池中执行
+        
+        Args:
+            known_sig: 最近一次读取或写入后的文件状态
+            backup_corrupt: 文件损坏时是否备份，备份后以内存中的数据为准
+            
+        Returns:
+            未修改时返回None，否则返回 (文件状态, 数据字典, 日志记录数)，文件损坏时数据字典为None
+        """
+        with self._file_lock:
+            sig = self._disk_signature()
+            if sig == known_sig:
+                return None
+            data = self._read_data_file(backup_corrupt=False) if self.data_file.exists() else {}
+            if data is None:
+                if backup_corrupt:
+                    # 保留损坏的文件，随后的写入以内存中的数据为准
+                    self._backup_corrupt_file()
+                    sig = self._disk_signature()
+                return sig, None, 0
+            data.setdefault("guns", {})
+            return sig, data, self._replay_journal(data)
+
+    def _merge_disk_change(self, sig: Tuple, data: Optional[Dict], journal_count: int) -> None:
+        """
+        写入前发现文件已被其他进程修改时，以磁盘上的数据为基础重放本地尚未保存的修改
+        需在读取数据的线程(事件循环)中调用
+        
+        Args:
+            sig, data, journal_count: _read_disk_if_changed 的返回值
+        """
+        self._disk_sig = sig
+        if data is None:
+            return
+        added, removed, changed = self._rebase(data, journal_count)
+        logger.info(
+            f"检测到数据文件已被其他进程修改，已重新加载并合并 {len(self._unsaved_ops)} 条本地修改 "
+            f"(新增{added} 删除{removed} 变化{changed})"
+        )
+
+    async def reload_if_changed(self) -> bool:
+        """
+        检查数据文件是否被外部修改，若已修改则重新加载，
+        只更新新增、删除或内容变化的枪械的索引与缓存，本地尚未保存的修改会重放到新数据上
+        需在事件循环中调用：等待文件锁与读取解析在线程池中执行，替换内存数据在持有 io_lock 时于事件循环中进行，
+        不会与进行中的写入交错
+        
+        Returns:
+            是否重新加载了数据
+        """
+        if self.store is not None or self.shards is not None:
+            return False
+        sig = self._disk_signature()
+        if sig == self._disk_sig or sig == self._unparsable_sig:
+            return False
+        
+        async with self.io_lock:
+            if self._batch_ops is not None:
+                return False
+            known_sig = self._disk_sig
+            changed_on_disk = await asyncio.to_thread(self._read_disk_if_changed, known_sig, False)
+            if changed_on_disk is None or self._disk_sig != known_sig:
+                # 文件未变化，或读取期间本实例已写入(写入前已合并)
+                return False
+            sig, data, journal_count = changed_on_disk
+            if data is None:
+                # 同一状态的文件不再重复尝试
+                self._unparsable_sig = sig
+                return False
+            self._disk_sig = sig
+            added, removed, changed = self._rebase(data, journal_count)
+        
+        logger.info(f"数据文件已被外部修改，已重新加载: 新增{added} 删除{removed} 变化{changed} 把枪械")
+        return True
+
+    def _rebase(self, data: Dict, journal_count: int) -> Tuple[int, int, int]:
+        """
+        以磁盘上的数据为基础，重放本地尚未保存的修改后替换内存数据
+        新增的代码与磁盘上的代码序号冲突时顺延到末尾，无法应用的修改会被丢弃
+        
+        Args:
+            data: 从数据文件读取并已重放日志的数据字典
+            journal_count: 日志中的记录数
+            
+        Returns:
+            (新增, 删除, 内容变化) 的枪械数
+        """
+        self._journal_count = journal_count
+        
+        merged = []
+        for op in self._unsaved_ops:
+            if op["op"] == "set_field" and op.get("append"):
+                levels = data["guns"].get(op["gun"], {}).get(op["field"], {})
+                if op["level"] in levels:
+                    new_level = str(max(int(level) for level in levels) + 1)
+                    logger.info(f"枪械 {op['gun']} 的 {op['field']} 等级 {op['level']} 已被其他进程占用，顺延为 {new_level}")
+                    op["level"] = new_level
             try:
-                with self.data_file.open('r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                logger.error(f"加载数据文件失败: {e}")
-                return {}
+                self._apply_op(data, op)
+            except (KeyError, TypeError) as e:
+                logger.warning(f"合并时丢弃无法应用的修改 {op}: {e}")
+                continue
+            merged.append(op)
+        self._unsaved_ops = merged
         
-        # 数据文件不存在，尝试从模板文件创建
-        return self._create_from_template()
-    
-    def _create_from_template(self) -> Dict:
+        return self._replace_data(data)
+
+    def _replace_data(self, data: Dict) -> Tuple[int, int, int]:
         """
-        从模板文件创建数据文件
+        替换内存数据，逐把枪械比较差异，只更新受影响枪械的搜索索引、排序视图与版本号
         
+        Args:
+            data: 新的数据字典
+            
         Returns:
-            创建的数据字典
+            (新增, 删除, 内容变化) 的枪械数
         """
-        data_dir = self.data_file.parent
+        old_guns, new_guns = self.data["guns"], data["guns"]
+        removed = [name for name in old_guns if name not in new_guns]
+        added = [name for name in new_guns if name not in old_guns]
+        changed = [
+            name for name, gun in new_guns.items()
+            if name in old_guns and old_guns[name] != gun
+        ]
+        
+        self.data = data
+        if self.search_index is None:
+            # 初始化尚未建立索引，稍后会完整构建
+            return len(added), len(removed), len(changed)
+        for name in removed:
+            self.search_index.remove(name)
+        for name in added:
+            self.search_index.add(name)
+        for name in (*removed, *added, *changed):
+            self._invalidate_gun(name)
+            for field_type in ("firezone", "battlefield"):
+                self._next_levels.pop((name, field_type), None)
+        if removed or added or list(old_guns) != list(new_guns):
+            self._invalidate_catalog()
+        return len(added), len(removed), len(changed)
+
+    def start_watcher(self, poll_interval: float = 2.0) -> None:
+        """
+        开始监视数据文件与日志文件的外部修改，需在事件循环中调用，仅 json 后端有效
+        
+        Args:
+            poll_interval: 不支持 inotify 时的轮询间隔(秒)
+        """
+        if self.store is not None or self.shards is not None or self._watcher is not None:
+            return
+        self._watcher = FileWatcher(
+            self.data_file.parent,
+            {self.data_file.name, self.journal_file.name},
+            self._schedule_reload,
+            poll_interval=poll_interval,
+        )
+        self._watcher.start()
+
+    def _schedule_reload(self) -> None:
+        """文件变化时在事件循环中安排一次重新加载，上一次尚未完成时跳过"""
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_running_loop().create_task(self._reload_from_watcher())
+
+    async def _reload_from_watcher(self) -> None:
+        try:
+            await self.reload_if_changed()
+        except Exception as e:
+            logger.error(f"重新加载数据文件时发生错误: {e}")
+
+    def stop_watcher(self) -> None:
+        """停止监视数据文件"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            self._reload_task = None
+
+    def _load_from_store(self) -> Dict:
+        """
+        从数据库加载数据，首次使用时先从 JSON 数据文件或模板迁移，之后不再迁移
+        
+        Returns:
+            加载的数据字典
+        """
+        if not self.store.migrated:
+            # 升级前已有数据的数据库只补记迁移标记
+            if self.store.is_empty():
+                if self.data_file.exists():
+                    source = self._read_data_file()
+                    source.setdefault("guns", {})
+                    self._replay_journal(source)
+                    logger.info(f"从数据文件 {self.data_file} 迁移到数据库")
+                else:
+                    source = self._read_template()
+                self.store.replace_all(source)
+            self.store.mark_migrated()
+        
+        return self.store.load()
+
+    def _load_from_shards(self) -> Dict:
+        """
+        读取分片索引，分片目录不存在时先从 JSON 数据文件或模板迁移
+        
+        Returns:
+            guns 为按需加载映射的数据字典
+        """
+        if not self.shards.exists():
+            if self.data_file.exists():
+                source = self._read_data_file()
+                source.setdefault("guns", {})
+                self._replay_journal(source)
+                logger.info(f"从数据文件 {self.data_file} 迁移到分片存储")
+            else:
+                source = self._read_template()
+            self.shards.create(source)
+        
+        return {"guns": self.shards.open()}
+
+    def _backup_corrupt_file(self) -> None:
+        """
+        保留损坏的数据文件，避免随后的保存将其覆盖
+        """
+        backup_file = self.data_file.with_suffix(".corrupt")
+        try:
+            os.replace(self.data_file, backup_file)
+            logger.warning(f"已将损坏的数据文件备份到: {backup_file}")
+        except OSError as e:
+            logger.error(f"备份损坏的数据文件失败: {e}")
+
+    def _replay_journal(self, data: Dict) -> int:
+        """
+        将日志文件中的修改记录重放到数据字典上，不修改实例状态，可在线程池中执行
+        
+        Args:
+            data: 从数据文件加载的数据字典
+            
+        Returns:
+            成功重放的记录数
+        """
+        count = 0
+        if not self.journal_file.exists():
+            return count
+        
+        data.setdefault("guns", {})
+        try:
+            with self.journal_file.open('r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply_op(data, json.loads(line))
+                    except (json.JSONDecodeError, KeyError, TypeError) as e:
+                        # 写入中途崩溃可能留下不完整的最后一行，跳过即可
+                        logger.warning(f"跳过无效的日志记录 (第 {line_no} 行): {e}")
+                        continue
+                    count += 1
+        except OSError as e:
+            logger.error(f"读取日志文件失败: {e}")
+            return count
+        
+        logger.info(f"已重放 {count} 条日志记录")
+        return count
+
+    @staticmethod
+    def _apply_op(data: Dict, op: Dict) -> None:
+        """
+        将一条修改记录应用到数据字典
+        
+        Args:
+            data: 数据字典
+            op: 修改记录，如 {"op": "add_gun", "gun": "枪名"}
+        """
+        guns = data["guns"]
+        action = op["op"]
+        gun_name = op["gun"]
+        
+        if action == "add_gun":
+            # 合并其他进程的修改时枪械可能已存在，保留已有数据
+            guns.setdefault(gun_name, {
+                "name": gun_name,
+                "firezone": {},
+                "battlefield": {}
+            })
+        elif action == "delete_gun":
+            guns.pop(gun_name, None)
+        elif action == "rename_gun":
+            gun_data = guns.pop(gun_name)
+            gun_data["name"] = op["new"]
+            guns[op["new"]] = gun_data
+        elif action == "set_field":
+            guns[gun_name].setdefault(op["field"], {})[op["level"]] = op["data"]
+        elif action == "delete_field":
+            guns[gun_name][op["field"]].pop(op["level"], None)
+        else:
+            raise KeyError(f"未知的操作类型: {action}")
+
+    def _rebuild_indexes(self) -> None:
+        """根据当前数据重建搜索索引，并使所有排序视图和版本号失效"""
+        self.search_index = GunSearchIndex(self.data["guns"].keys())
+        self._sorted_views.clear()
+        self._gun_versions.clear()
+        self._next_levels.clear()
+        self._invalidate_catalog()
+
+    def _invalidate_catalog(self) -> None:
+        """枪械集合变化后使有序枪名索引失效"""
+        self._gun_order = None
+        self.catalog_version += 1
+
+    def _invalidate_gun(self, gun_name: str) -> None:
+        """
+        使枪械的排序视图失效并递增其版本号
+        
+        Args:
+            gun_name: 枪械名称
+        """
+        for by_price in (True, False):
+            for field_type in ("firezone", "battlefield"):
+                self._sorted_views.pop((gun_name, field_type, by_price))
+        self._version_seq += 1
+        self._gun_versions[gun_name] = self._version_seq
+
+    def get_gun_version(self, gun_name: str) -> int:
+        """
+        获取枪械的版本号，枪械数据每次修改后版本号都会变化，可用于缓存失效
+        
+        Args:
+            gun_name: 枪械名称
+            
+        Returns:
+            版本号
+        """
+        version = self._gun_versions.get(gun_name)
+        if version is None:
+            self._version_seq += 1
+            version = self._gun_versions[gun_name] = self._version_seq
+        return version
+
+    def _update_indexes(self, op: Dict) -> None:
+        """
+        根据修改记录增量更新索引
+        
+        Args:
+            op: 已应用的修改记录
+        """
+        action = op["op"]
+        gun_name = op["gun"]
+        self._invalidate_gun(gun_name)
+        if action in ("add_gun", "delete_gun", "rename_gun"):
+            self._invalidate_catalog()
+        if action == "add_gun":
+            self.search_index.add(gun_name)
+        elif action == "delete_gun":
+            self.search_index.remove(gun_name)
+        elif action == "rename_gun":
+            self.search_index.rename(gun_name, op["new"])
+            self._invalidate_gun(op["new"])
+        
+        if action == "set_field":
+            key = (gun_name, op["field"])
+            if key in self._next_levels:
+                self._next_levels[key] = max(self._next_levels[key], int(op["level"]) + 1)
+        else:
+            for field_type in ("firezone", "battlefield"):
+                self._next_levels.pop((gun_name, field_type), None)
+                if action == "rename_gun":
+                    self._next_levels.pop((op["new"], field_type), None)
+
+    def _commit(self, op: Dict) -> None:
+        """
+        应用一条修改记录并持久化
+        日志模式下仅追加记录，否则重写整个数据文件
+        
+        Args:
+            op: 修改记录
+        """
+        self._apply_op(self.data, op)
+        if self.shards is not None and op["op"] in ("set_field", "delete_field"):
+            # 嵌套修改不经过映射的 __setitem__，需要手动标记分片
+            self.shards.mark_dirty(op["gun"])
+        self._update_indexes(op)
+        if self.store is None and self.shards is None:
+            # 已应用到内存但尚未写入磁盘，合并外部修改时需要重放
+            self._unsaved_ops.append(op)
+        
+        if self._batch_ops is not None:
+            self._batch_ops.append(op)
+            return
+        
+        self.persist_ops([op])
+
+    def begin_batch(self, quiet: bool = True) -> None:
+        """
+        开始批量修改：之后的修改只更新内存和索引，由 end_batch 取出后统一持久化
+        支持嵌套，只有最外层的 end_batch 会返回修改记录
+        
+        Args:
+            quiet: 批量期间是否将每条修改的日志降为 debug 级别
+        """
+        if self._batch_depth == 0:
+            self._batch_ops = []
+            self._batch_quiet = quiet
+        self._batch_depth += 1
+
+    def end_batch(self) -> List[Dict]:
+        """
+        结束批量修改
+        
+        Returns:
+            最外层批量结束时返回累积的修改记录，否则返回空列表
+        """
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return []
+        ops, self._batch_ops = self._batch_ops, None
+        return ops
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        批量修改：期间的修改只更新内存和索引，退出时统一持久化一次
+        
+        用法:
+            with datamanager.batch():
+                datamanager.add_field_data(...)
+        """
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            ops = self.end_batch()
+            if ops:
+                self.persist_ops(ops)
+                logger.info(f"已批量保存 {len(ops)} 条修改")
+
+    def persist_ops(self, ops: List[Dict]) -> None:
+        """
+        持久化已应用到内存的修改记录
+        
+        Args:
+            ops: 修改记录列表
+        """
+        if self.store is not None:
+            if self.store.apply_many(ops):
+                self._reload_store(self.store.load())
+            return
+        if self.shards is not None:
+            self.shards.flush()
+            return
+        
+        if not self.journal:
+            self._request_save()
+        elif len(ops) >= self.compact_threshold:
+            # 修改条数超过阈值时直接合并，比逐条追加日志更快
+            self.compact()
+        else:
+            self._append_journal()
+            if self._journal_count >= self.compact_threshold:
+                self.compact()
+
+    async def persist_ops_async(self, ops: List[Dict]) -> None:
+        """
+        persist_ops 的异步版本，需在事件循环中持有 io_lock 调用
+        文件锁等待、磁盘读写与解析在线程池中执行，合并其他进程的修改只在事件循环中进行
+        
+        Args:
+            ops: 修改记录列表
+        """
+        if self.store is not None:
+            if await asyncio.to_thread(self.store.apply_many, ops):
+                self._reload_store(await asyncio.to_thread(self.store.load))
+            return
+        if self.shards is not None:
+            await asyncio.to_thread(self.shards.flush)
+            return
+        
+        if not self.journal:
+            if self.deferred_save:
+                self._request_save()
+            else:
+                await self._save_data_async()
+        elif len(ops) >= self.compact_threshold:
+            await self.compact_async()
+        else:
+            await self._append_journal_async()
+            if self._journal_count >= self.compact_threshold:
+                await self.compact_async()
+
+    def _reload_store(self, data: Dict) -> None:
+        """数据库已被其他实例修改，用重新读取的数据替换内存镜像"""
+        added, removed, changed = self._replace_data(data)
+        logger.info(f"数据库已被其他实例修改，已重新加载: 新增{added} 删除{removed} 变化{changed} 把枪械")
+
+    def _log_change(self, message: str) -> None:
+        """记录修改日志，批量修改期间降为 debug 级别以免刷屏"""
+        if self._batch_ops is not None and self._batch_quiet:
+            logger.debug(message)
+        else:
+            logger.info(message)
+
+    def _journal_payload(self) -> Tuple[int, str]:
+        """
+        序列化所有尚未保存的修改记录
         
-        template_file = Path(__file__).parent.parent / 'template' / 'default_gun_code.json'
+        Returns:
+            (记录数, 待追加的文本)
+        """
+        return len(self._unsaved_ops), "".join(
+            json.dumps(op, ensure_ascii=False, separators=(',', ':')) + "\n" for op in self._unsaved_ops
+        )
+
+    def _try_append_journal(self, text: str, known_sig: Optional[Tuple]) -> Tuple[bool, Optional[Tuple]]:
+        """
+        持有文件锁向日志文件追加记录并 fsync，文件已被其他进程修改时放弃追加
+        只读写磁盘，不修改内存数据，可在线程池中执行
+        
+        Args:
+            text: _journal_payload 序列化的文本
+            known_sig: 序列化时的文件状态
+            
+        Returns:
+            (是否已追加, 追加后的文件状态或 _read_disk_if_changed 的返回值)
+        """
+        with self._file_lock:
+            changed = self._read_disk_if_changed(known_sig, backup_corrupt=True)
+            if changed is not None:
+                return False, changed
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.journal_file.open('a+b') as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # 上次写入中途崩溃留下了不完整的最后一行，另起一行以免新记录与其拼接
+                        text = "\n" + text
+                f.write(text.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            return True, self._disk_signature()
+
+    def _journal_appended(self, count: int, sig: Tuple) -> None:
+        """追加成功后移除已写入的修改记录"""
+        self._journal_count += count
+        del self._unsaved_ops[:count]
+        self._disk_sig = sig
+
+    def _append_journal(self) -> None:
+        """
+        向日志文件追加所有尚未保存的修改记录，多条记录只 fsync 一次
+        """
+        try:
+            while True:
+                count, text = self._journal_payload()
+                appended, result = self._try_append_journal(text, self._disk_sig)
+                if appended:
+                    break
+                self._merge_disk_change(*result)
+        except Exception as e:
+            logger.error(f"写入日志失败: {e}")
+            raise
+        self._journal_appended(count, result)
+
+    async def _append_journal_async(self) -> None:
+        """_append_journal 的异步版本，磁盘读写在线程池中执行，合并在事件循环中进行"""
+        try:
+            while True:
+                count, text = self._journal_payload()
+                appended, result = await asyncio.to_thread(self._try_append_journal, text, self._disk_sig)
+                if appended:
+                    break
+                self._merge_disk_change(*result)
+        except Exception as e:
+            logger.error(f"写入日志失败: {e}")
+            raise
+        self._journal_appended(count, result)
+
+    def compact(self) -> None:
+        """
+        将内存中的数据写回数据文件并清空日志
+        """
+        count = self._journal_count
+        self._save_data()
+        if count:
+            logger.info(f"已合并 {count} 条日志记录到数据文件")
+
+    async def compact_async(self) -> None:
+        """compact 的异步版本"""
+        count = self._journal_count
+        await self._save_data_async()
+        if count:
+            logger.info(f"已合并 {count} 条日志记录到数据文件")
+    
+    def _read_template(self) -> Dict:
+        """
+        读取模板文件
+        
+        Returns:
+            模板数据字典，模板不可用时为空数据
+        """
+        template_file = self.get_template_path()
         
         template_data = {"guns": {}}
         
@@ -63,38 +812,239 @@ class DataManager:
             try:
                 with template_file.open('r', encoding='utf-8') as f:
                     template_data = json.load(f)
-                logger.info(f"从模板文件 {template_file} 创建数据文件")
+                logger.info(f"从模板文件 {template_file} 创建数据")
             except (json.JSONDecodeError, FileNotFoundError) as e:
-                logger.warning(f"模板文件加载失败: {e}，将创建空数据文件")
+                logger.warning(f"模板文件加载失败: {e}，将创建空数据")
         else:
-            logger.info("模板文件不存在，将创建空数据文件")
+            logger.info("模板文件不存在，将创建空数据")
+        
+        return template_data
+
+    def _create_from_template(self) -> Dict:
+        """
+        从模板文件创建数据文件
+        
+        Returns:
+            创建的数据字典
+        """
+        data_dir = self.data_file.parent
+        
+        template_data = self._read_template()
         
         # 确保目录存在
         data_dir.mkdir(parents=True, exist_ok=True)
         
         # 保存数据到目标文件
         try:
-            with self.data_file.open('w', encoding='utf-8') as f:
-                json.dump(template_data, f, ensure_ascii=False, indent=4)
+            self._write_atomic(json.dumps(template_data, ensure_ascii=False, indent=4))
             logger.info(f"已创建数据文件: {self.data_file}")
         except Exception as e:
             logger.error(f"创建数据文件失败: {e}")
         
         return template_data
     
+    def _try_save(self, seq: int, known_sig: Optional[Tuple]) -> Tuple[bool, Optional[Tuple]]:
+        """
+        持有文件锁序列化并写入数据文件、清空日志，文件已被其他进程修改时放弃写入
+        只读取内存数据，可在线程池中执行；调用方需持有 io_lock，保证序列化期间数据不被修改
+        
+        Args:
+            seq: _next_save_seq 返回的写入序号
+            known_sig: 发起保存时的文件状态
+            
+        Returns:
+            (是否已写入, 写入后的文件状态或 _read_disk_if_changed 的返回值)
+        """
+        with self._file_lock:
+            changed = self._read_disk_if_changed(known_sig, backup_corrupt=True)
+            if changed is not None:
+                return False, changed
+            self._write_atomic((seq, self._dump_data()))
+            # 数据文件已包含全部修改，日志可以清空
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            return True, self._disk_signature()
+
+    def _data_saved(self, saved_ops: int, sig: Tuple) -> None:
+        """写入成功后移除已写入的修改记录"""
+        self._journal_count = 0
+        del self._unsaved_ops[:saved_ops]
+        self._disk_sig = sig
+
     def _save_data(self) -> None:
         """
-        保存数据到文件
+        保存数据到文件，文件已被其他进程修改时先合并再重试
         """
-        # 确保目录存在
-        self.data_file.parent.mkdir(parents=True, exist_ok=True)
-        
+        self._dirty = False
+        start = time.perf_counter()
         try:
-            with self.data_file.open('w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=4)
+            while True:
+                saved_ops, seq = len(self._unsaved_ops), self._next_save_seq()
+                written, result = self._try_save(seq, self._disk_sig)
+                if written:
+                    break
+                self._merge_disk_change(*result)
         except Exception as e:
+            self._dirty = True
             logger.error(f"保存数据失败: {e}")
             raise
+        self._data_saved(saved_ops, result)
+        self._observe_save(time.perf_counter() - start)
+
+    async def _save_data_async(self) -> None:
+        """
+        _save_data 的异步版本，需在事件循环中持有 io_lock 调用
+        文件锁等待、序列化与写入在线程池中执行，io_lock 保证期间数据不被修改；
+        修改记录在写入成功后才移除，合并其他进程的修改只在事件循环中进行
+        """
+        self._dirty = False
+        start = time.perf_counter()
+        try:
+            while True:
+                saved_ops, seq = len(self._unsaved_ops), self._next_save_seq()
+                written, result = await asyncio.to_thread(self._try_save, seq, self._disk_sig)
+                if written:
+                    break
+                self._merge_disk_change(*result)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"保存数据失败: {e}")
+            raise
+        self._data_saved(saved_ops, result)
+        self._observe_save(time.perf_counter() - start)
+
+    def _observe_save(self, seconds: float) -> None:
+        """将保存耗时报告给 save_observer"""
+        if self.save_observer is not None:
+            self.save_observer(seconds)
+
+    def _next_save_seq(self) -> int:
+        """分配写入序号，用于丢弃晚于较新快照完成的旧快照"""
+        self._save_seq += 1
+        return self._save_seq
+
+    def _dump_data(self) -> str:
+        """
+        序列化内存数据
+        
+        Returns:
+            序列化后的文本
+        """
+        return json.dumps(self.data, ensure_ascii=False, indent=4)
+
+    def _write_atomic(self, payload: Union[str, Tuple[int, str]]) -> None:
+        """
+        原子写入数据文件：写入临时文件并 fsync 后重命名覆盖
+        
+        Args:
+            payload: 序列化后的文本，或 (写入序号, 文本)
+        """
+        seq, text = payload if isinstance(payload, tuple) else (None, payload)
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._write_lock:
+            # 较旧的快照晚于较新的快照完成时直接丢弃
+            if seq is not None and seq <= self._written_seq:
+                return
+            
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{self.data_file.name}.", suffix=".tmp", dir=self.data_file.parent
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.data_file)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            
+            if seq is not None:
+                self._written_seq = seq
+
+    def _request_save(self) -> None:
+        """
+        请求保存数据，延迟写入模式下仅标记为脏并安排后台写入
+        """
+        if not self.deferred_save:
+            self._save_data()
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中，无法安排后台任务，直接写入
+            self._save_data()
+            return
+        
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """
+        等待一段时间后将期间累积的修改一次性写入文件
+        写入期间持有 io_lock，不会与其他修改、合并或重新加载交错；
+        写入失败时按指数退避重试，直到成功或数据不再需要写入
+        """
+        delay = self.flush_delay
+        while True:
+            await asyncio.sleep(delay)
+            async with self.io_lock:
+                if not self._dirty:
+                    return
+                try:
+                    await self._save_data_async()
+                    return
+                except Exception as e:
+                    delay = min(max(delay * 2, 1.0), self.FLUSH_RETRY_MAX_DELAY)
+                    logger.error(f"后台保存数据失败，{delay:.0f} 秒后重试: {e}")
+
+    def flush(self) -> None:
+        """
+        立即写入尚未保存的修改，插件卸载前应调用
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        
+        if self._dirty:
+            self._save_data()
+            logger.info("已写入所有待保存的数据")
+
+    def close(self) -> None:
+        """
+        写入待保存的修改并关闭存储后端
+        """
+        self.stop_watcher()
+        self.flush()
+        if self.store is not None:
+            self.store.close()
+        if self.shards is not None:
+            self.shards.flush()
+
+    async def flush_async(self) -> None:
+        """flush 的异步版本，需在事件循环中持有 io_lock 调用"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        
+        if self._dirty:
+            await self._save_data_async()
+            logger.info("已写入所有待保存的数据")
+
+    async def close_async(self) -> None:
+        """close 的异步版本，需在事件循环中持有 io_lock 调用"""
+        self.stop_watcher()
+        await self.flush_async()
+        if self.store is not None:
+            self.store.close()
+        if self.shards is not None:
+            await asyncio.to_thread(self.shards.flush)
 
     def get_gun_codes(self, gun_name: str, field_type: str, sort_by_price: bool = False) -> List[Tuple[int, Dict]]:
         """
@@ -108,27 +1058,29 @@ class DataManager:
         Returns:
             包含等级和数据的元组列表 [(level, data), ...]
         """
+        by_price = field_type == "firezone" and sort_by_price
+        version = self.get_gun_version(gun_name)
+        view = self._sorted_views.get((gun_name, field_type, by_price), version)
+        if view is not None:
+            return list(view)
+        
         gun = self.get_gun(gun_name)
         if not gun or field_type not in gun:
             logger.warning(f"获取枪械代码失败: 枪械 {gun_name} 或字段类型 {field_type} 不存在")
             return []
         
-        field_data = gun[field_type]
-        if not field_data:
-            logger.info(f"枪械 {gun_name} 的 {field_type} 字段没有数据")
-            return []
-        
-        result = [(int(level), data) for level, data in field_data.items()]
+        result = [(int(level), data) for level, data in gun[field_type].items()]
         
         # 如果是firezone且需要按价格排序
-        if field_type == "firezone" and sort_by_price:
+        if by_price:
             result.sort(key=lambda x: x[1].get("price", 0))
-            logger.info(f"已按价格排序获取 {gun_name} 的 {field_type} 代码")
         else:
             result.sort(key=lambda x: x[0])
-            logger.info(f"已按等级排序获取 {gun_name} 的 {field_type} 代码")
         
-        return result
+        # 缓存排序结果，枪械数据修改时失效
+        self._sorted_views.put((gun_name, field_type, by_price), version, result)
+        logger.debug(f"已生成 {gun_name} 的 {field_type} 排序视图")
+        return list(result)
 
     def get_gun_codes_simple(self, gun_name: str, field_type: str, sort_by_price: bool = False) -> List[Dict]:
         """
@@ -159,13 +1111,8 @@ class DataManager:
             logger.warning(f"枪械 {gun_name} 已存在，添加失败")
             return False
         
-        self.data["guns"][gun_name] = {
-            "name": gun_name,
-            "firezone": {},
-            "battlefield": {}
-        }
-        self._save_data()
-        logger.info(f"成功添加枪械: {gun_name}")
+        self._commit({"op": "add_gun", "gun": gun_name})
+        self._log_change(f"成功添加枪械: {gun_name}")
         return True
     
     def delete_gun(self, gun_name: str) -> bool:
@@ -179,9 +1126,8 @@ class DataManager:
             是否删除成功
         """
         if gun_name in self.data["guns"]:
-            del self.data["guns"][gun_name]
-            self._save_data()
-            logger.info(f"成功删除枪械: {gun_name}")
+            self._commit({"op": "delete_gun", "gun": gun_name})
+            self._log_change(f"成功删除枪械: {gun_name}")
             return True
         
         logger.warning(f"枪械 {gun_name} 不存在，删除失败")
@@ -199,11 +1145,8 @@ class DataManager:
             是否更新成功
         """
         if old_name in self.data["guns"] and new_name not in self.data["guns"]:
-            gun_data = self.data["guns"].pop(old_name)
-            gun_data["name"] = new_name
-            self.data["guns"][new_name] = gun_data
-            self._save_data()
-            logger.info(f"成功更新枪械名称: {old_name} -> {new_name}")
+            self._commit({"op": "rename_gun", "gun": old_name, "new": new_name})
+            self._log_change(f"成功更新枪械名称: {old_name} -> {new_name}")
             return True
         
         logger.warning(f"枪械名称更新失败: {old_name} -> {new_name}")
@@ -222,7 +1165,7 @@ class DataManager:
         return self.data["guns"].get(gun_name)
     
     def add_field_data(self, gun_name: str, field_type: str, level: int, 
-                      code: str, description: str, price: Optional[int] = None) -> bool:
+                      code: str, description: str, price: Optional[int] = None) -> Optional[int]:
         """
         添加字段数据
         
@@ -235,11 +1178,23 @@ class DataManager:
             price: 价格 (仅firezone需要)
             
         Returns:
-            是否添加成功
+            实际写入的等级，序号被其他进程占用时为顺延后的等级；添加失败时返回None
+        """
+        op = self.add_field_op(gun_name, field_type, level, code, description, price)
+        return None if op is None else int(op["level"])
+
+    def add_field_op(self, gun_name: str, field_type: str, level: int,
+                     code: str, description: str, price: Optional[int] = None) -> Optional[Dict]:
+        """
+        添加字段数据并返回修改记录
+        批量修改期间记录在持久化时才可能顺延序号，持久化后读取记录中的 level 即为实际写入的等级
+        
+        Returns:
+            修改记录，添加失败时返回None
         """
         if gun_name not in self.data["guns"] or field_type not in ['firezone', 'battlefield']:
             logger.warning(f"添加字段数据失败: 枪械 {gun_name} 或字段类型 {field_type} 不存在")
-            return False
+            return None
         
         field_data = {
             "code": code,
@@ -249,13 +1204,17 @@ class DataManager:
         if field_type == "firezone":
             if price is None:
                 logger.warning("firezone 类型必须提供 price 参数")
-                return False
+                return None
             field_data["price"] = price
         
-        self.data["guns"][gun_name][field_type][str(level)] = field_data
-        self._save_data()
-        logger.info(f"成功为枪械 {gun_name} 添加 {field_type} 等级 {level} 的数据")
-        return True
+        op = {"op": "set_field", "gun": gun_name, "field": field_type,
+              "level": str(level), "data": field_data}
+        if str(level) not in self.data["guns"][gun_name].get(field_type, {}):
+            # 新增的代码，合并其他进程的修改时序号冲突可顺延
+            op["append"] = True
+        self._commit(op)
+        self._log_change(f"成功为枪械 {gun_name} 添加 {field_type} 等级 {level} 的数据")
+        return op
     
     def delete_field_data(self, gun_name: str, field_type: str, level: int) -> bool:
         """
@@ -271,9 +1230,9 @@ class DataManager:
         """
         gun = self.get_gun(gun_name)
         if gun and field_type in gun and str(level) in gun[field_type]:
-            del gun[field_type][str(level)]
-            self._save_data()
-            logger.info(f"成功删除枪械 {gun_name} 的 {field_type} 等级 {level} 数据")
+            self._commit({"op": "delete_field", "gun": gun_name, "field": field_type,
+                          "level": str(level)})
+            self._log_change(f"成功删除枪械 {gun_name} 的 {field_type} 等级 {level} 数据")
             return True
         
         logger.warning(f"删除字段数据失败: 枪械 {gun_name} 的 {field_type} 等级 {level} 不存在")
@@ -301,7 +1260,7 @@ class DataManager:
             logger.warning(f"更新字段数据失败: 枪械 {gun_name} 的 {field_type} 等级 {level} 不存在")
             return False
         
-        field_data = gun[field_type][str(level)]
+        field_data = dict(gun[field_type][str(level)])
         
         if code is not None:
             field_data["code"] = code
@@ -310,10 +1269,30 @@ class DataManager:
         if price is not None and field_type == "firezone":
             field_data["price"] = price
         
-        self._save_data()
-        logger.info(f"成功更新枪械 {gun_name} 的 {field_type} 等级 {level} 数据")
+        self._commit({"op": "set_field", "gun": gun_name, "field": field_type,
+                      "level": str(level), "data": field_data})
+        self._log_change(f"成功更新枪械 {gun_name} 的 {field_type} 等级 {level} 数据")
         return True
     
+    def next_level(self, gun_name: str, field_type: str) -> int:
+        """
+        获取新增代码应使用的序号(当前最大序号 + 1)，结果会被缓存并随修改增量更新
+        
+        Args:
+            gun_name: 枪械名称
+            field_type: 字段类型
+            
+        Returns:
+            下一个序号
+        """
+        key = (gun_name, field_type)
+        level = self._next_levels.get(key)
+        if level is None:
+            field_data = self.get_gun_field_data(gun_name, field_type) or {}
+            level = max((int(existing) for existing in field_data), default=0) + 1
+            self._next_levels[key] = level
+        return level
+
     def get_field_data(self, gun_name: str, field_type: str, level: int) -> Optional[Dict]:
         """
         获取字段数据
@@ -339,6 +1318,17 @@ class DataManager:
             枪械名称列表
         """
         return list(self.data["guns"].keys())
+
+    def get_gun_order(self) -> List[str]:
+        """
+        获取缓存的有序枪名索引，枪械集合不变时不会重新生成，调用方不应修改返回的列表
+        
+        Returns:
+            按添加顺序排列的枪械名称列表
+        """
+        if self._gun_order is None:
+            self._gun_order = list(self.data["guns"].keys())
+        return self._gun_order
     
     def search_guns(self, keyword: str) -> List[str]:
         """
@@ -350,12 +1340,38 @@ class DataManager:
         Returns:
             匹配的枪械名称列表
         """
-        keyword_lower = keyword.lower()
-        result = [gun_name for gun_name in self.data["guns"].keys() 
-                 if keyword_lower in gun_name.lower()]
+        result = self.search_index.search(keyword)
         logger.info(f"关键词 '{keyword}' 搜索到 {len(result)} 个结果")
         return result
 
+    def fuzzy_search_guns(self, keyword: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        容错搜索枪名，可匹配拼写错误或省略分隔符的关键词
+        
+        Args:
+            keyword: 关键词
+            limit: 最多返回的结果数
+            
+        Returns:
+            按相似度从高到低排列的 [(枪械名称, 相似度), ...]，相似度 1.0 表示忽略分隔符后完全包含关键词
+        """
+        result = self.search_index.fuzzy_search(keyword, limit=limit)
+        logger.info(f"关键词 '{keyword}' 容错搜索到 {len(result)} 个结果")
+        return result
+
+    def rank_guns(self, keyword: str, gun_names: List[str]) -> List[str]:
+        """
+        按与关键词的相关程度对枪名排序
+        
+        Args:
+            keyword: 关键词
+            gun_names: 待排序的枪械名称
+            
+        Returns:
+            排序后的枪械名称列表
+        """
+        return self.search_index.rank(keyword, gun_names)
+
     def get_gun_field_data(self, gun_name: str, field_type: str) -> Optional[Dict]:
         """
         获取枪械指定字段的所有数据
@@ -400,16 +1416,66 @@ class DataManager:
             是否创建成功
         """
         try:
-            if self.data_file.exists():
-                self.data_file.unlink()
-                logger.info(f"已删除现有数据文件: {self.data_file}")
-            
-            self.data = self._create_from_template()
-            logger.info("从模板重新创建数据文件成功")
+            self._install_template(*self._recreate_storage())
+            return True
+        except Exception as e:
+            logger.error(f"从模板重新创建失败: {e}")
+            return False
+
+    async def recreate_from_template_async(self) -> bool:
+        """
+        recreate_from_template 的异步版本，需在事件循环中持有 io_lock 调用
+        文件与数据库的重建在线程池中执行，替换内存数据在事件循环中进行
+        
+        Returns:
+            是否创建成功
+        """
+        try:
+            self._install_template(*await asyncio.to_thread(self._recreate_storage))
             return True
         except Exception as e:
             logger.error(f"从模板重新创建失败: {e}")
             return False
+
+    def _recreate_storage(self) -> Tuple[Dict, Optional[Tuple]]:
+        """
+        用模板数据重建数据文件、数据库或分片存储，只读写磁盘，不修改内存数据，可在线程池中执行
+        
+        Returns:
+            (新的数据字典, json 后端写入后的文件状态)
+        """
+        if self.store is not None:
+            data = self._read_template()
+            self.store.replace_all(data)
+            return data, None
+        
+        if self.shards is not None:
+            self.shards.create(self._read_template())
+            return {"guns": self.shards.open()}, None
+        
+        with self._file_lock:
+            if self.data_file.exists():
+                self.data_file.unlink()
+                logger.info(f"已删除现有数据文件: {self.data_file}")
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            data = self._create_from_template()
+            return data, self._disk_signature()
+
+    def _install_template(self, data: Dict, sig: Optional[Tuple]) -> None:
+        """替换为重建后的数据并重建索引"""
+        self.data = data
+        if self.store is not None:
+            target = "数据库"
+        elif self.shards is not None:
+            target = "分片存储"
+        else:
+            target = "数据文件"
+            self._journal_count = 0
+            self._unsaved_ops = []
+            self._disk_sig = sig
+        self._rebuild_indexes()
+        logger.info(f"从模板重新创建{target}成功")
     
     def get_template_path(self) -> Path:
         """
@@ -418,7 +1484,7 @@ class DataManager:
         Returns:
             模板文件路径
         """
-        return Path(__file__).parent.parent / 'template' / 'default_gun_code.json'
+        return Path(__file__).parent / 'template' / 'default_gun_code.json'
     
     def template_exists(self) -> bool:
         """
@@ -0,0 +1,99 @@
+from astrbot.api import logger
+import threading
+import time
+from pathlib import Path
+from typing import IO, Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """
+    跨进程的建议性文件锁
+    Linux/macOS 使用 fcntl.flock，Windows 使用 msvcrt.locking，两者都不可用时只在进程内互斥；
+    同一线程可重入，不同线程之间互斥
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: float = 30.0, poll_interval: float = 0.05):
+        """
+        Args:
+            path: 锁文件路径
+            timeout: 等待锁的最长时间(秒)
+            poll_interval: 轮询锁的间隔(秒)
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file: Optional[IO] = None
+        if fcntl is None and msvcrt is None:
+            logger.warning("当前平台不支持文件锁，多个进程同时写入数据时可能互相覆盖")
+
+    def acquire(self) -> None:
+        """获取锁，超时抛出 TimeoutError"""
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"等待文件锁超时: {self.path}")
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """释放锁"""
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def _lock_file(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                elif msvcrt is not None:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    f.close()
+                    raise TimeoutError(f"等待文件锁超时: {self.path}")
+                time.sleep(self.poll_interval)
+        self._file = f
+
+    def _unlock_file(self) -> None:
+        f, self._file = self._file, None
+        if f is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError as e:
+            logger.warning(f"释放文件锁失败: {e}")
+        finally:
+            f.close()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
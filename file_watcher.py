@@ -0,0 +1,131 @@
+from astrbot.api import logger
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Set, Union
+
+
+class _Inotify:
+    """通过 ctypes 调用 Linux inotify，监视目录中的文件写入与替换"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"无法监视目录 {directory}")
+
+    def read_names(self) -> Set[str]:
+        """读取所有待处理事件，返回涉及的文件名"""
+        names = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(buffer):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self.EVENT_HEADER.size
+                names.add(os.fsdecode(buffer[offset:offset + length].rstrip(b"\0")))
+                offset += length
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    监视目录中指定文件的变化
+    Linux 上使用 inotify，事件经去抖后在事件循环中回调；
+    其他平台或 inotify 不可用时按固定间隔轮询回调，由回调自行判断文件是否变化
+    """
+
+    def __init__(self, directory: Union[str, Path], names: Iterable[str], callback: Callable[[], None],
+                 poll_interval: float = 2.0, debounce: float = 0.2):
+        """
+        Args:
+            directory: 被监视的目录
+            names: 需要关注的文件名
+            callback: 文件变化时在事件循环中调用的函数，应尽快返回，读取文件等耗时操作应安排为任务
+            poll_interval: 轮询模式下的检查间隔(秒)
+            debounce: inotify 模式下合并连续事件的等待时间(秒)
+        """
+        self.directory = Path(directory)
+        self.names = set(names)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.mode: Optional[str] = None
+        self._inotify: Optional[_Inotify] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """在当前事件循环中开始监视"""
+        if self.mode is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.directory)
+                self._loop.add_reader(self._inotify.fd, self._on_events)
+                self.mode = "inotify"
+            except (OSError, AttributeError, NotImplementedError) as e:
+                logger.info(f"inotify 不可用，改为轮询: {e}")
+                if self._inotify is not None:
+                    self._inotify.close()
+                    self._inotify = None
+        if self.mode is None:
+            self._poll_task = self._loop.create_task(self._poll())
+            self.mode = "poll"
+        logger.info(f"开始监视数据文件变化 ({self.mode})")
+
+    def stop(self) -> None:
+        """停止监视"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if self._inotify is not None:
+            self._loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        self.mode = None
+
+    def _on_events(self) -> None:
+        if self._inotify is None or not (self._inotify.read_names() & self.names):
+            return
+        # 编辑器保存时常产生多次事件，合并为一次回调
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = self._loop.call_later(self.debounce, self._fire)
+
+    def _fire(self) -> None:
+        self._pending = None
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"处理数据文件变化时发生错误: {e}")
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self._fire()
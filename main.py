@@ -4,17 +4,128 @@ from astrbot.api import logger, AstrBotConfig
 import astrbot.api.message_components as Comp
 from astrbot.api.message_components import Image
 from pathlib import Path
-from playwright.async_api import async_playwright
 import asyncio
+import csv
+import functools
+import json
+import math
+import os
 import time
 import shlex
-from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    SHANGHAI_TZ = ZoneInfo("Asia/Shanghai")
+except Exception:
+    # 缺少 tzdata 时退回固定的东八区
+    SHANGHAI_TZ = timezone(timedelta(hours=8))
 
 from .data_manager import DataManager
+from .async_data_manager import AsyncDataManager
+from .browser_pool import BrowserPool
+from .capture_engine import CircuitBreaker, RequestBlocker, wait_for_first_selector
+from .bulk_io import SUPPORTED_SUFFIXES, apply_codes, export_codes, parse_codes
+from .selection_store import SelectionStore
+from .metrics import Metrics, timed_handler
+from .pagination import VersionedCache, paginate
+from .screenshot_codec import EncodedScreenshot, ScreenshotEncoder
+from .throttle import RateLimiter, ReplyCache
+
+def requires_data(func):
+    """
+    等待改枪码数据加载完成后再执行命令处理函数的装饰器，
+    用于 yield 结果的异步生成器处理函数，加载失败时直接回复错误
+    """
+    @functools.wraps(func)
+    async def wrapper(self, event: AstrMessageEvent, *args, **kwargs):
+        if not await self._wait_ready():
+            yield event.plain_result("❌改枪码数据加载失败，请联系管理员查看日志")
+            return
+        async for result in func(self, event, *args, **kwargs):
+            yield result
+    return wrapper
+
+def rate_limited(command: str):
+    """
+    按发送者和群限流的装饰器，用于 yield 结果的异步生成器处理函数
+    管理员不受限制；被限流的请求计入 throttled_requests 指标，
+    同一用户在提示间隔内只收到一次提示，其余请求直接忽略
+
+    Args:
+        command: 命令名称，作为 command 标签
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, event: AstrMessageEvent, *args, **kwargs):
+            sender = event.get_sender_id()
+            if sender not in self.admin_list:
+                group = event.get_group_id()
+                user_key = f"{sender}_{group}"
+                scope = None
+                if not self.user_limiter.peek(user_key):
+                    scope, limiter, key = "user", self.user_limiter, user_key
+                elif group and not self.group_limiter.peek(group):
+                    scope, limiter, key = "group", self.group_limiter, group
+                if scope is not None:
+                    self.metrics.inc("throttled_requests", command=command, scope=scope)
+                    if self._throttle_notices.get(user_key, scope) is None:
+                        self._throttle_notices.put(user_key, scope, True)
+                        messages = []
+                        if event.get_platform_name() == "aiocqhttp":
+                            messages.append(Comp.At(qq=sender))
+                        target = "你" if scope == "user" else "本群"
+                        messages.append(Comp.Plain(
+                            f"⏳{target}的请求过于频繁，请 {math.ceil(limiter.retry_after(key))} 秒后再试"
+                        ))
+                        yield event.chain_result(messages)
+                    return
+                self.user_limiter.consume(user_key)
+                if group:
+                    self.group_limiter.consume(group)
+            async for result in func(self, event, *args, **kwargs):
+                yield result
+        return wrapper
+    return decorator
 
 class yunsdf(Star):
+    # 每日密码截图缓存有效期(秒)
+    SCREENSHOT_TTL = 1800
+    # 缓存过期前多久提前刷新(秒)
+    PREWARM_MARGIN = 300
+    # 预热失败后的重试间隔(秒)
+    PREWARM_RETRY_DELAY = 300
+    # Prometheus 指标文件的写入间隔(秒)
+    METRICS_WRITE_INTERVAL = 60
+    # 容错搜索只保留相似度与最高分相差不超过此值的候选
+    FUZZY_SCORE_MARGIN = 0.2
+    # 同一用户两次限流提示的最短间隔(秒)
+    THROTTLE_NOTICE_INTERVAL = 30
+    # 从每日密码区域中提取 地图/密码 对的脚本
+    EXTRACT_PASSWORDS_JS = """
+    el => Array.from(el.querySelectorAll('.stat')).map(stat => {
+        const text = sel => {
+            const node = stat.querySelector(sel);
+            return node ? node.innerText.trim() : '';
+        };
+        return {map: text('.stat-title'), password: text('.stat-value'), desc: text('.stat-desc')};
+    }).filter(item => item.map && item.password)
+    """
+    # 等待每日密码区域内的图片与页面字体加载完成的脚本
+    WAIT_ELEMENT_ASSETS_JS = """
+    el => Promise.all([
+        document.fonts ? document.fonts.ready : null,
+        ...Array.from(el.querySelectorAll('img')).filter(img => !img.complete).map(img => new Promise(resolve => {
+            img.addEventListener('load', resolve);
+            img.addEventListener('error', resolve);
+        })),
+    ]).then(() => true)
+    """
+
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
+        init_started = time.perf_counter()
         self.data_path = StarTools.get_data_dir("yunsdf")
         self.bot_config = context.get_config()
         bot_admins = self.bot_config.get("admins_id", [])
@@ -26,16 +137,131 @@ class yunsdf(Star):
         else:
             self.admin_list = list(set(bot_admins + plugin_admins))
 
-        self.datamanager = DataManager(data_file=self.data_path/"gun_data.json")
-        self.user_temp_data = {}
+        self.metrics = Metrics()
+        self.metrics_file = self.data_path / "metrics.prom" if config.get("metrics_prometheus_file", False) else None
+        self._metrics_task: Optional[asyncio.Task] = None
+
+        self._datamanager_options = dict(
+            data_file=self.data_path/"gun_data.json",
+            journal=config.get("storage_journal", False),
+            compact_threshold=config.get("journal_compact_threshold", 500),
+            deferred_save=config.get("deferred_save", False),
+            flush_delay=config.get("flush_delay", 2.0),
+            backend=config.get("storage_backend", "json"),
+            shard_cache_size=config.get("shard_cache_size", 32),
+        )
+        self.watch_data_file = config.get("watch_data_file", True)
+        # 数据在 initialize() 中异步加载，命令处理前等待 _ready_task 完成
+        self.datamanager: Optional[AsyncDataManager] = None
+        self._ready_task: Optional[asyncio.Task] = None
+        # 启动各阶段耗时(秒)
+        self.startup_timings: Dict[str, float] = {}
+        self.fuzzy_limit = config.get("fuzzy_search_limit", 5)
+        self.user_temp_data = SelectionStore(
+            ttl=config.get("selection_ttl", 300),
+            max_entries=config.get("selection_max_entries", 1000),
+        )
+        # 枪械改枪码回复缓存: 枪名 -> 回复文本，按枪械版本号失效
+        self._render_cache = VersionedCache(max_entries=256)
+        # 枪械列表/搜索结果的分页渲染缓存，以及搜索结果缓存
+        self.list_page_size = config.get("list_page_size", 20)
+        self._page_cache = VersionedCache(max_entries=256)
+        self._search_cache = VersionedCache(max_entries=128)
+        # 命令限流: 每个用户(按群区分)和每个群各一个令牌桶
+        self.user_limiter = RateLimiter(
+            per_minute=config.get("rate_limit_user_per_minute", 10),
+            burst=config.get("rate_limit_user_burst", 3),
+        )
+        self.group_limiter = RateLimiter(
+            per_minute=config.get("rate_limit_group_per_minute", 60),
+            burst=config.get("rate_limit_group_burst", 15),
+        )
+        self._throttle_notices = ReplyCache(ttl=self.THROTTLE_NOTICE_INTERVAL, max_entries=1024)
+        # 短时间内相同改枪码查询的结果缓存: 查询 -> (候选枪名, 是否容错搜索, 选择列表文本)
+        self._guncode_cache = ReplyCache(ttl=config.get("reply_cache_ttl", 10))
         self.screenshot_dir = self.data_path / "screenshots"
         self.screenshot_dir.mkdir(exist_ok=True)
+        self.browser_pool = BrowserPool(max_pages=config.get("browser_max_pages", 50))
+        self._capture_task: Optional[asyncio.Task] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self.capture_breaker = CircuitBreaker(
+            failure_threshold=config.get("capture_failure_threshold", 3),
+            cooldown=config.get("capture_cooldown", 600),
+        )
+        self.prewarm_enabled = config.get("daily_password_prewarm", True)
+        self.daily_reset_hour = config.get("daily_reset_hour", 0)
+        self.daily_reset_delay = config.get("daily_reset_delay_minutes", 5)
+        self.daily_password_mode = config.get("daily_password_mode", "image")
+        self.daily_password_url = config.get("daily_password_url", "https://www.acgice.com/sjz/")
+        self.capture_block_resources = config.get("capture_block_resources", True)
+        self.capture_blocked_hosts = config.get("capture_blocked_hosts", [])
+        self._password_text_cache: Tuple[float, str] = (0.0, "")
+        self.screenshot_encoder = ScreenshotEncoder(
+            fmt=config.get("screenshot_format", "jpeg"),
+            quality=config.get("screenshot_quality", 80),
+        )
+        self._last_encoded: Optional[EncodedScreenshot] = None
+        self.startup_timings["construct"] = time.perf_counter() - init_started
 
     async def initialize(self):
-        """插件初始化"""
-        logger.info("Yuns三角洲插件初始化完成")
+        """插件初始化，数据加载在后台进行，不阻塞 AstrBot 启动"""
+        self.user_temp_data.start_sweeper()
+        if self._ready_task is None:
+            self._ready_task = asyncio.create_task(self._load_datamanager())
+        if self.metrics_file is not None:
+            self._metrics_task = asyncio.create_task(self._metrics_loop())
+        if self.prewarm_enabled:
+            self._prewarm_task = asyncio.create_task(self._prewarm_loop())
+        logger.info("Yuns三角洲插件初始化完成，改枪码数据正在后台加载")
+
+    async def _load_datamanager(self):
+        """在线程池中加载改枪码数据，完成后记录启动耗时"""
+        started = time.perf_counter()
+        try:
+            datamanager = await asyncio.to_thread(DataManager, **self._datamanager_options)
+        except Exception as e:
+            logger.error(f"加载改枪码数据失败: {e}")
+            return
+        datamanager.save_observer = lambda seconds: self.metrics.observe("data_save_seconds", seconds)
+        if self.watch_data_file:
+            datamanager.start_watcher()
+        self.datamanager = AsyncDataManager(datamanager)
+        
+        self.startup_timings["data_load"] = datamanager.load_timings["load"]
+        self.startup_timings["index_build"] = datamanager.load_timings["index"]
+        self.startup_timings["ready"] = time.perf_counter() - started
+        logger.info("改枪码数据加载完成: " + self._render_startup_timings())
+
+    async def _wait_ready(self) -> bool:
+        """
+        等待改枪码数据加载完成，initialize() 尚未调用时在此启动加载
+        
+        Returns:
+            数据是否可用
+        """
+        if self._ready_task is None:
+            self._ready_task = asyncio.create_task(self._load_datamanager())
+        await asyncio.shield(self._ready_task)
+        return self.datamanager is not None
+
+    def _render_startup_timings(self) -> str:
+        """格式化启动各阶段耗时"""
+        names = {
+            "construct": "构造",
+            "data_load": "读取数据",
+            "index_build": "建立索引",
+            "ready": "数据就绪",
+        }
+        parts = [
+            f"{label} {self.startup_timings[key] * 1000:.1f}ms"
+            for key, label in names.items() if key in self.startup_timings
+        ]
+        return ", ".join(parts)
 
     @filter.command("改枪码", alias=["guncode"])
+    @timed_handler("改枪码")
+    @rate_limited("改枪码")
+    @requires_data
     async def guncode(self, event: AstrMessageEvent, gun_name: str = None):
         """获取改枪码"""
         if gun_name is None:
@@ -46,7 +272,7 @@ class yunsdf(Star):
             yield event.chain_result(messages)
             return
         
-        found_guns = self.datamanager.search_guns(gun_name)
+        found_guns, _, res = self._resolve_guncode_query(gun_name)
         gun_num = len(found_guns)
         
         if gun_num < 1:
@@ -64,12 +290,6 @@ class yunsdf(Star):
             return
         
         if event.get_platform_name() in ("aiocqhttp", "webchat"):
-            res = f"找到 {gun_num} 个匹配的枪械：\n"
-            res += "| id | 枪名 |\n"
-            for i in range(gun_num):
-                res += f"{i+1}. {found_guns[i]}\n"
-            res += "\n请执行命令 /选择 id ，否则请输入 /取消"
-            
             self._set_user_temp_data(event.get_sender_id(), event.get_group_id(), found_guns)
             
             messages = []
@@ -81,9 +301,11 @@ class yunsdf(Star):
             gun_name = found_guns[0]
             async for result in self._display_gun_codes(event, gun_name):
                 yield result
-            yield event.chain_result(messages)
 
     @filter.command("选择")
+    @timed_handler("选择")
+    @rate_limited("选择")
+    @requires_data
     async def select_gun(self, event: AstrMessageEvent, choose_id: int):
         """选择枪械"""
         try:
@@ -123,6 +345,56 @@ class yunsdf(Star):
         messages.append(Comp.Plain("✅已取消选择"))
         yield event.chain_result(messages)
 
+    def _resolve_guncode_query(self, gun_name: str) -> Tuple[List[str], bool, str]:
+        """
+        查找与查询匹配的枪械，并生成多个候选时的选择列表文本
+        结果按目录版本号缓存一小段时间，相同查询在此期间直接复用
+
+        Args:
+            gun_name: 查询的枪名
+
+        Returns:
+            (候选枪名, 是否为容错搜索结果, 选择列表文本)
+        """
+        version = self.datamanager.catalog_version
+        cached = self._guncode_cache.get(gun_name, version)
+        if cached is not None:
+            self.metrics.inc("cache_requests", cache="guncode_query", result="hit")
+            return cached
+        self.metrics.inc("cache_requests", cache="guncode_query", result="miss")
+        
+        found_guns = self.datamanager.search_guns(gun_name)
+        fuzzy = not found_guns
+        if fuzzy:
+            # 没有子串匹配时使用容错搜索，按相似度给出候选
+            scored = self.datamanager.fuzzy_search_guns(gun_name, limit=self.fuzzy_limit)
+            exact = [name for name, score in scored if score >= 1.0]
+            if len(exact) == 1:
+                # 只有一把枪在忽略分隔符后包含关键词(如 sr25 -> SR-25)，直接显示
+                found_guns = exact
+            else:
+                top = scored[0][1] if scored else 0
+                found_guns = [name for name, score in scored if score >= top - self.FUZZY_SCORE_MARGIN]
+        else:
+            found_guns = self.datamanager.rank_guns(gun_name, found_guns)
+            if found_guns[0].lower() == gun_name.lower():
+                found_guns = found_guns[:1]
+        
+        res = ""
+        if len(found_guns) > 1:
+            if fuzzy:
+                res = f"未找到名称包含 '{gun_name}' 的枪械，您是不是要找：\n"
+            else:
+                res = f"找到 {len(found_guns)} 个匹配的枪械：\n"
+            res += "| id | 枪名 |\n"
+            for i, name in enumerate(found_guns):
+                res += f"{i+1}. {name}\n"
+            res += "\n请执行命令 /选择 id ，否则请输入 /取消"
+        
+        result = (found_guns, fuzzy, res)
+        self._guncode_cache.put(gun_name, version, result)
+        return result
+
     async def _display_gun_codes(self, event: AstrMessageEvent, gun_name: str):
         """显示枪械的改枪码"""
         gun_data = self.datamanager.get_gun(gun_name)
@@ -134,42 +406,53 @@ class yunsdf(Star):
             yield event.chain_result(messages)
             return
         
-        result = f"欢迎使用Yun's三角洲插件~\n🔫 枪械: {gun_name}\n\n"
+        result = self._render_gun_codes(gun_name)
+        
+        messages = []
+        if event.get_platform_name() == "aiocqhttp":
+            messages.append(Comp.At(qq=event.get_sender_id()))
+        messages.append(Comp.Plain(result))
+        yield event.chain_result(messages)
+
+    def _render_gun_codes(self, gun_name: str) -> str:
+        """渲染枪械的改枪码回复文本，按枪械版本号缓存"""
+        version = self.datamanager.get_gun_version(gun_name)
+        cached = self._render_cache.get(gun_name, version)
+        if cached is not None:
+            self.metrics.inc("cache_requests", cache="gun_render", result="hit")
+            return cached
+        self.metrics.inc("cache_requests", cache="gun_render", result="miss")
+        
+        lines = [f"欢迎使用Yun's三角洲插件~\n🔫 枪械: {gun_name}\n"]
         
         firezone_codes = self.datamanager.get_gun_codes(gun_name, "firezone", sort_by_price=True)
         if firezone_codes:
-            result += "🔥 烽火地带 改枪码:\n"
+            lines.append("🔥 烽火地带 改枪码:")
             for level, data in firezone_codes:
-                price = data.get('price', 0)
-                price_text = f"{price/10000:.1f}万" if price >= 10000 else f"{price}元"
-                if "丐版" in data['description'] or "基础" in data['description']:
-                    price_text = f"{price_text}丐版"
-                
                 # 枪名 描述: 枪名-烽火地带-代码
-                code_line = f"{gun_name} {data['description']}: {gun_name}-烽火地带-{data['code']}"
-                result += f"  {code_line}\n"
-            result += "\n"
+                lines.append(f"  {gun_name} {data['description']}: {gun_name}-烽火地带-{data['code']}")
+            lines.append("")
         else:
-            result += "🔥 烽火地带: 暂无数据\n\n"
+            lines.append("🔥 烽火地带: 暂无数据\n")
         
         # Battlefield 数据
         battlefield_codes = self.datamanager.get_gun_codes(gun_name, "battlefield")
         if battlefield_codes:
-            result += "⚔️ 全面战场 改枪码:\n"
+            lines.append("⚔️ 全面战场 改枪码:")
             for level, data in battlefield_codes:
                 # 枪名 描述: 枪名-全面战场-代码
-                code_line = f"{gun_name} {data['description']}: {gun_name}-全面战场-{data['code']}"
-                result += f"  {code_line}\n"
+                lines.append(f"  {gun_name} {data['description']}: {gun_name}-全面战场-{data['code']}")
+            result = "\n".join(lines) + "\n"
         else:
-            result += "⚔️ 全面战场: 暂无数据"
+            lines.append("⚔️ 全面战场: 暂无数据")
+            result = "\n".join(lines)
         
-        messages = []
-        if event.get_platform_name() == "aiocqhttp":
-            messages.append(Comp.At(qq=event.get_sender_id()))
-        messages.append(Comp.Plain(result))
-        yield event.chain_result(messages)
+        self._render_cache.put(gun_name, version, result)
+        return result
 
     @filter.command("改枪码管理")
+    @timed_handler("改枪码管理")
+    @requires_data
     async def guncode_manage(self, event: AstrMessageEvent, subcommand: str = None, arg1: str = None, arg2: str = None, arg3: str = None):
         """管理改枪码"""
         if event.get_sender_id() not in self.admin_list:
@@ -188,8 +471,10 @@ class yunsdf(Star):
                 "• 添加代码: /改枪码管理 添加代码 <枪名> <烽火地带|全面战场> <代码> <描述> [价格]\n"
                 "• 删除代码: /改枪码管理 删除代码 <枪名> <烽火地带|全面战场> <序号>\n"
                 "• 查看枪械: /改枪码管理 查看枪械 [枪名]\n"
-                "• 枪械列表: /改枪码管理 枪械列表\n"
-                "• 搜索枪械: /改枪码管理 搜索 <关键词>"
+                "• 枪械列表: /改枪码管理 枪械列表 [页码]\n"
+                "• 搜索枪械: /改枪码管理 搜索 <关键词> [页码]\n"
+                "• 批量导入: /改枪码管理 导入 <文件名.jsonl|.csv>\n"
+                "• 批量导出: /改枪码管理 导出 <文件名.jsonl|.csv>"
             )
             yield event.plain_result(help_text)
             return
@@ -211,10 +496,16 @@ class yunsdf(Star):
                 async for result in self._view_gun(event, arg1):
                     yield result
             case "枪械列表":
-                async for result in self._list_guns(event):
+                async for result in self._list_guns(event, arg1):
                     yield result
             case "搜索":
-                async for result in self._search_guns(event, arg1):
+                async for result in self._search_guns(event, arg1, arg2):
+                    yield result
+            case "导入":
+                async for result in self._import_codes(event, arg1):
+                    yield result
+            case "导出":
+                async for result in self._export_codes(event, arg1):
                     yield result
             case _:
                 messages = []
@@ -273,16 +564,12 @@ class yunsdf(Star):
                 yield event.plain_result(f"❌枪械 '{gun_name}' 不存在，请先添加枪械")
                 return
             
-            existing_codes = gun_data.get(field_type, {})
-            if existing_codes:
-                max_level = max(int(level) for level in existing_codes.keys())
-                level = max_level + 1
-            else:
-                level = 1
+            level = self.datamanager.next_level(gun_name, field_type)
             
-            if self.datamanager.add_field_data(gun_name, field_type, level, code, description, price):
+            stored_level = await self.datamanager.add_field_data(gun_name, field_type, level, code, description, price)
+            if stored_level is not None:
                 code_line = f"{gun_name} {description}: {gun_name}-{field_type_cn}-{code}"
-                yield event.plain_result(f"✅成功添加代码 (序号{level}):\n{code_line}")
+                yield event.plain_result(f"✅成功添加代码 (序号{stored_level}):\n{code_line}")
             else:
                 yield event.plain_result(f"❌添加代码失败，请检查枪械名称和参数")
                 
@@ -313,7 +600,7 @@ class yunsdf(Star):
                 yield event.plain_result(f"❌要删除的代码不存在")
                 return
             
-            if self.datamanager.delete_field_data(gun_name, field_type, level):
+            if await self.datamanager.delete_field_data(gun_name, field_type, level):
                 code_line = f"{gun_name} {field_data['description']}: {gun_name}-{field_type_cn}-{field_data['code']}"
                 yield event.plain_result(f"✅成功删除代码 (序号{level}):\n{code_line}")
             else:
@@ -322,7 +609,62 @@ class yunsdf(Star):
         except ValueError:
             yield event.plain_result("❌序号必须是数字")
 
+    def _resolve_bulk_file(self, file_name: str) -> Optional[Path]:
+        """将批量导入导出的文件名解析为插件数据目录下的路径"""
+        path = self.data_path / Path(file_name).name
+        if path.suffix.lower() not in SUPPORTED_SUFFIXES:
+            return None
+        return path
+
+    async def _import_codes(self, event: AstrMessageEvent, file_name: str):
+        """从插件数据目录批量导入改枪码"""
+        if not file_name:
+            yield event.plain_result("❌请提供文件名！格式: /改枪码管理 导入 <文件名.jsonl|.csv>")
+            return
+        
+        path = self._resolve_bulk_file(file_name)
+        if path is None:
+            yield event.plain_result("❌仅支持 .jsonl、.ndjson 或 .csv 文件")
+            return
+        if not path.exists():
+            yield event.plain_result(f"❌文件不存在，请先将文件放到插件数据目录: {path}")
+            return
+        
+        try:
+            # 读取与校验在线程池中进行，只有写入内存在写锁内于事件循环中执行
+            report, rows = await asyncio.to_thread(parse_codes, path)
+            report = await self.datamanager.run(apply_codes, self.datamanager.sync, report, rows, quiet=True)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"导入改枪码失败: {e}")
+            yield event.plain_result(f"❌导入失败: {e}")
+            return
+        
+        yield event.plain_result(report.render())
+
+    async def _export_codes(self, event: AstrMessageEvent, file_name: str):
+        """批量导出改枪码到插件数据目录"""
+        if not file_name:
+            yield event.plain_result("❌请提供文件名！格式: /改枪码管理 导出 <文件名.jsonl|.csv>")
+            return
+        
+        path = self._resolve_bulk_file(file_name)
+        if path is None:
+            yield event.plain_result("❌仅支持 .jsonl、.ndjson 或 .csv 文件")
+            return
+        
+        try:
+            count, elapsed = await self.datamanager.run_in_thread(export_codes, self.datamanager.sync, path)
+        except OSError as e:
+            logger.error(f"导出改枪码失败: {e}")
+            yield event.plain_result(f"❌导出失败: {e}")
+            return
+        
+        rate = count / elapsed if elapsed > 0 else 0
+        yield event.plain_result(f"✅已导出 {count} 条改枪码到: {path}\n• 耗时: {elapsed:.2f}秒 ({rate:.0f} 行/秒)")
+
     @filter.command("每日密码", alias=["dailycode", "密码","今日密码"])
+    @timed_handler("每日密码")
+    @rate_limited("每日密码")
     async def daily_password(self, event: AstrMessageEvent):
         """获取三角洲行动每日密码"""
         messages = []
@@ -331,18 +673,45 @@ class yunsdf(Star):
             if event.get_platform_name() == "aiocqhttp":
                 messages.append(Comp.At(qq=event.get_sender_id()))
             messages.append(Comp.Plain(" 欢迎使用Yuns三角洲插件~\n"))
-            messages.append(Comp.Plain("🔄 正在从ACGICE网站获取每日密码，请稍候...\n"))
-            yield event.chain_result(messages)
-            messages = []
             
-            # 使用带重试的版本
-            screenshot_path = await self._get_daily_password_with_retry()
+            # 缓存过期但仍有当日的旧截图时先返回旧截图，同时在后台刷新
+            screenshot_path = await self._check_screenshot_cache()
+            cache_result = "hit"
+            if screenshot_path is None:
+                cache_result = "stale"
+                screenshot_path = self._get_stale_screenshot()
+                if screenshot_path is not None and self._crossed_daily_reset(screenshot_path):
+                    screenshot_path = None
+                if screenshot_path is not None:
+                    self._start_capture()
             
-            if screenshot_path and screenshot_path.exists():
+            if screenshot_path is None:
+                cache_result = "miss"
+                messages.append(Comp.Plain("🔄 正在从ACGICE网站获取每日密码，请稍候...\n"))
+                yield event.chain_result(messages)
+                messages = []
+                
+                # 使用带重试的版本，并发请求共享同一次获取
+                screenshot_path = await self._get_daily_password_shared()
+            self.metrics.inc("cache_requests", cache="daily_password", result=cache_result)
+            if cache_result != "hit" and screenshot_path is not None and self.capture_breaker.is_open:
+                messages.append(Comp.Plain("⚠️ 网站暂时无法访问，以下为最近一次获取的结果\n"))
+            
+            if screenshot_path and screenshot_path.suffix == ".json":
+                if event.get_platform_name() == "aiocqhttp":
+                    messages.append(Comp.At(qq=event.get_sender_id()))
+                messages.append(Comp.Plain(self._render_password_record(screenshot_path)))
+                yield event.chain_result(messages)
+            elif screenshot_path and screenshot_path.exists():
                 if event.get_platform_name() == "aiocqhttp":
                     messages.append(Comp.At(qq=event.get_sender_id()))
                 messages.append(Comp.Plain("🎯 今日地图密码"))
-                messages.append(Comp.Image(file=str(screenshot_path)))
+                encoded = await self._encode_screenshot(screenshot_path)
+                if encoded is not None:
+                    # 直接发送内存中压缩后的数据，无需每次重新读取文件
+                    messages.append(Comp.Image.fromBytes(encoded.data))
+                else:
+                    messages.append(Comp.Image(file=str(screenshot_path)))
                 yield event.chain_result(messages)
             else:
                 if event.get_platform_name() == "aiocqhttp":
@@ -358,85 +727,114 @@ class yunsdf(Star):
             messages.append(Comp.Plain("❌ 获取每日密码时发生错误，请稍后重试"))
             yield event.chain_result(messages)
 
-    async def _get_daily_password_with_retry(self, max_retries: int = 3) -> Path:
-        """带重试机制的获取每日密码截图"""
-        cached_path = await self._check_screenshot_cache()
-        if cached_path:
-            return cached_path
+    def _start_capture(self, force: bool = False) -> asyncio.Task:
+        """启动每日密码获取任务，已有进行中的任务时直接复用"""
+        if self._capture_task is None or self._capture_task.done():
+            self._capture_task = asyncio.create_task(self._get_daily_password_with_retry(force=force))
+            self._capture_task.add_done_callback(self._log_capture_result)
+        else:
+            logger.info("已有正在进行的每日密码获取，等待其结果")
+        return self._capture_task
+
+    @staticmethod
+    def _log_capture_result(task: asyncio.Task):
+        """记录后台获取任务的异常，避免未处理的任务异常"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"每日密码获取任务失败: {task.exception()}")
+
+    async def _get_daily_password_shared(self) -> Optional[Path]:
+        """合并并发的每日密码请求，所有等待者共享同一次获取的结果或异常"""
+        # shield 防止单个请求被取消时连带取消共享的获取任务
+        return await asyncio.shield(self._start_capture())
+
+    async def _get_daily_password_with_retry(self, max_retries: int = 3, force: bool = False) -> Path:
+        """带重试机制的获取每日密码截图，熔断期间直接返回最近一次的结果"""
+        if not force:
+            cached_path = await self._check_screenshot_cache()
+            if cached_path:
+                return cached_path
+        
+        if not self.capture_breaker.allow():
+            self.metrics.inc("capture_short_circuits")
+            logger.warning(f"每日密码获取已熔断，{self.capture_breaker.remaining():.0f} 秒内使用最近一次的结果")
+            return self._get_stale_screenshot()
         
         last_exception = None
         
         for attempt in range(max_retries):
+            start = time.perf_counter()
             try:
                 logger.info(f"尝试获取每日密码截图 (第 {attempt + 1}/{max_retries} 次)")
+                if attempt > 0:
+                    self.metrics.inc("capture_retries")
                 
                 screenshot_path = await self._get_daily_password_screenshot(attempt)
                 
                 if screenshot_path and screenshot_path.exists():
+                    self.metrics.observe("capture_seconds", time.perf_counter() - start, result="success")
+                    self.capture_breaker.record_success()
                     logger.info(f"✅ 第 {attempt + 1} 次尝试成功")
                     return screenshot_path
                 else:
+                    self.metrics.observe("capture_seconds", time.perf_counter() - start, result="empty")
+                    self.capture_breaker.record_failure()
                     logger.warning(f"❌ 第 {attempt + 1} 次尝试失败: 截图文件未生成")
                     
             except Exception as e:
+                self.metrics.observe("capture_seconds", time.perf_counter() - start, result="error")
+                self.capture_breaker.record_failure()
                 last_exception = e
                 logger.warning(f"❌ 第 {attempt + 1} 次尝试失败: {str(e)}")
                 
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and not self.capture_breaker.is_open:
                     wait_time = (attempt + 1) * 2
                     logger.info(f"等待 {wait_time} 秒后重试...")
                     await asyncio.sleep(wait_time)
+            
+            if self.capture_breaker.is_open:
+                # 已熔断，不再继续重试
+                self.metrics.inc("capture_failures")
+                return self._get_stale_screenshot()
         
+        self.metrics.inc("capture_failures")
         logger.error(f"所有 {max_retries} 次尝试均失败，最后错误: {last_exception}")
         return None
 
     async def _get_daily_password_screenshot(self, attempt: int = 0) -> Path:
         """使用 Playwright 获取每日密码截图 - 改进的等待机制"""
         screenshot_path = self.screenshot_dir / "daily_password.png"
+        # 先写入临时文件再替换，避免覆盖正在发送的旧截图
+        tmp_path = self.screenshot_dir / "daily_password.tmp.png"
         
         # 根据尝试次数调整超时时间
         timeout_multiplier = 1 + (attempt * 0.5)
         timeout_ms = int(30000 * timeout_multiplier)
         
-        async with async_playwright() as p:
-            browser = None
+        # 快速模式下拦截统计/广告请求，只等待目标元素及其图片、字体就绪，不等待网络空闲
+        fast = self.capture_block_resources
+        mode = "fast" if fast else "full"
+        
+        async with self.browser_pool.page(timeout_ms) as page:
             try:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--lang=zh-CN'
-                    ],
-                    timeout=timeout_ms
-                )
-                
-                context = await browser.new_context(
-                    locale='zh-CN',
-                    timezone_id='Asia/Shanghai',
-                    viewport={'width': 1200, 'height': 800},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                    ignore_https_errors=True,
-                )
-                
-                context.set_default_timeout(timeout_ms)
-                page = await context.new_page()
-                page.set_default_timeout(timeout_ms)
-                page.set_default_navigation_timeout(timeout_ms)
+                blocker = None
+                if fast:
+                    blocker = RequestBlocker(self.capture_blocked_hosts)
+                    await blocker.install(page)
                 
                 # 导航到目标页面
                 logger.info("导航到目标页面...")
+                nav_start = time.perf_counter()
                 await page.goto(
-                    'https://www.acgice.com/sjz/', 
-                    wait_until='networkidle',  # 使用更严格的等待条件
+                    self.daily_password_url, 
+                    wait_until='domcontentloaded' if fast else 'networkidle',
                     timeout=timeout_ms
                 )
                 
-                # 等待页面完全加载
-                await page.wait_for_load_state('networkidle')
+                if not fast:
+                    # 等待页面完全加载
+                    await page.wait_for_load_state('networkidle')
                 
-                # 多种选择器尝试，使用基于事件的等待
+                # 同时等待所有候选选择器，取最先出现的元素
                 selectors_to_try = [
                     '.stats.bg-base-500',
                     '.text-center.stats',
@@ -444,51 +842,60 @@ class yunsdf(Star):
                     'div[class*="stats"]',
                 ]
                 
-                target_element = None
-                for selector in selectors_to_try:
+                selector, target_element = await wait_for_first_selector(page, selectors_to_try, timeout_ms=10000)
+                if target_element:
+                    logger.info(f"成功找到元素: {selector}")
                     try:
-                        logger.info(f"尝试选择器: {selector}")
-                        # 使用 wait_for_selector 等待元素出现
-                        target_element = await page.wait_for_selector(
-                            selector, 
-                            timeout=10000,
-                            state='visible'  # 确保元素可见
-                        )
-                        if target_element:
-                            logger.info(f"成功找到元素: {selector}")
-                            
-                            # 等待元素稳定
+                        # 等待元素稳定
+                        if fast:
+                            await target_element.wait_for_element_state('stable', timeout=5000)
+                            await asyncio.wait_for(target_element.evaluate(self.WAIT_ELEMENT_ASSETS_JS), timeout=5)
+                        else:
                             await page.wait_for_function(
                                 f"document.querySelector('{selector}').offsetHeight > 0",
                                 timeout=5000
                             )
-                            break
                     except Exception as e:
-                        logger.warning(f"选择器 {selector} 失败: {e}")
-                        continue
+                        logger.warning(f"等待元素 {selector} 稳定失败: {e}")
+                
+                ready_seconds = time.perf_counter() - nav_start
+                self.metrics.observe("capture_ready_seconds", ready_seconds, mode=mode)
+                if blocker is not None:
+                    self.metrics.inc("capture_blocked_requests", blocker.total)
+                    logger.info(f"页面就绪耗时 {ready_seconds:.2f} 秒，{blocker.summary()}")
+                else:
+                    logger.info(f"页面就绪耗时 {ready_seconds:.2f} 秒")
+                
+                if target_element and self.daily_password_mode == "text":
+                    passwords = await self._extract_daily_passwords(target_element)
+                    if passwords:
+                        return self._save_password_record(passwords)
+                    logger.warning("未能提取每日密码文本，回退到截图")
                 
                 if not target_element:
                     logger.warning("未找到目标元素，尝试截图整个页面")
-                    await page.screenshot(path=str(screenshot_path), full_page=True)
+                    await page.screenshot(path=str(tmp_path), full_page=True)
                     logger.info("已截图整个页面作为fallback")
                 else:
                     # 确保元素在视图中
                     await target_element.scroll_into_view_if_needed()
                     
-                    # 等待可能的动画完成
-                    await page.wait_for_timeout(500)
+                    if not fast:
+                        # 等待可能的动画完成
+                        await page.wait_for_timeout(500)
                     
                     logger.info("截图目标元素...")
                     await target_element.screenshot(
-                        path=str(screenshot_path),
+                        path=str(tmp_path),
                         type='png',
                         timeout=10000
                     )
-                    logger.info(f"截图保存到: {screenshot_path}")
                 
                 # 验证截图文件
-                if screenshot_path.exists() and screenshot_path.stat().st_size > 0:
-                    logger.info("截图验证成功")
+                if tmp_path.exists() and tmp_path.stat().st_size > 0:
+                    os.replace(tmp_path, screenshot_path)
+                    logger.info(f"截图验证成功，保存到: {screenshot_path}")
+                    await self._encode_screenshot(screenshot_path)
                     return screenshot_path
                 else:
                     logger.error("截图文件为空或不存在")
@@ -496,55 +903,180 @@ class yunsdf(Star):
                 
             except Exception as e:
                 logger.error(f"截图过程中发生错误: {e}")
-                if screenshot_path.exists():
+                if tmp_path.exists():
                     try:
-                        screenshot_path.unlink()
+                        tmp_path.unlink()
                     except:
                         pass
                 raise e
-                
-            finally:
-                if browser:
-                    try:
-                        await browser.close()
-                        logger.info("浏览器已关闭")
-                    except Exception as e:
-                        logger.warning(f"关闭浏览器时发生错误: {e}")
+
+    async def _encode_screenshot(self, screenshot_path: Path) -> Optional[EncodedScreenshot]:
+        """
+        获取截图压缩后的数据，新截图在线程池中重新编码并记录节省的体积
+        
+        Returns:
+            编码结果，失败时返回None，此时应直接发送原文件
+        """
+        encoded = self.screenshot_encoder.get(screenshot_path)
+        if encoded is not None:
+            return encoded
+        
+        try:
+            encoded, reused = await asyncio.to_thread(self.screenshot_encoder.encode_file, screenshot_path)
+        except Exception as e:
+            logger.warning(f"压缩截图失败: {e}")
+            return None
+        
+        if reused:
+            self.metrics.inc("screenshot_dedup")
+            logger.info(f"截图内容未变化，复用已压缩的数据 ({encoded.digest[:12]})")
+        else:
+            self.metrics.inc("screenshot_bytes", encoded.raw_size, kind="raw")
+            self.metrics.inc("screenshot_bytes", len(encoded.data), kind="encoded")
+            logger.info(
+                f"截图压缩: PNG {encoded.raw_size / 1024:.1f}KB -> {encoded.format.upper()} "
+                f"{len(encoded.data) / 1024:.1f}KB，节省 {encoded.saved / max(1, encoded.raw_size):.1%} "
+                f"({encoded.digest[:12]})"
+            )
+        self._last_encoded = encoded
+        return encoded
+
+    async def _extract_daily_passwords(self, element) -> List[dict]:
+        """从每日密码区域提取 地图/密码 结构化数据"""
+        try:
+            return await element.evaluate(self.EXTRACT_PASSWORDS_JS)
+        except Exception as e:
+            logger.warning(f"提取每日密码文本失败: {e}")
+            return []
+
+    def _save_password_record(self, passwords: List[dict]) -> Path:
+        """将提取到的每日密码保存为 JSON 记录"""
+        record_path = self.screenshot_dir / "daily_password.json"
+        tmp_path = self.screenshot_dir / "daily_password.tmp.json"
+        record = {"captured_at": time.time(), "passwords": passwords}
+        
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, record_path)
+        logger.info(f"已提取 {len(passwords)} 条每日密码，保存到: {record_path}")
+        return record_path
+
+    def _render_password_record(self, record_path: Path) -> str:
+        """将每日密码 JSON 记录渲染为文本回复，按文件修改时间缓存"""
+        mtime = record_path.stat().st_mtime
+        if self._password_text_cache[0] == mtime:
+            return self._password_text_cache[1]
+        
+        with record_path.open('r', encoding='utf-8') as f:
+            record = json.load(f)
+        
+        result = "🎯 今日地图密码\n"
+        for item in record.get("passwords", []):
+            line = f"🗺️ {item['map']}: {item['password']}"
+            if item.get("desc"):
+                line += f" ({item['desc']})"
+            result += line + "\n"
+        
+        self._password_text_cache = (mtime, result)
+        return result
+
+    def _daily_password_files(self) -> List[Path]:
+        """当前模式下可作为缓存的每日密码文件"""
+        files = [self.screenshot_dir / "daily_password.png"]
+        if self.daily_password_mode == "text":
+            files.insert(0, self.screenshot_dir / "daily_password.json")
+        return files
 
     async def _check_screenshot_cache(self) -> Path:
         """检查截图缓存是否有效"""
-        screenshot_path = self.screenshot_dir / "daily_password.png"
+        screenshot_path = self._get_stale_screenshot()
         
-        if not screenshot_path.exists():
+        if screenshot_path is None:
             return None
         
         try:
-            file_size = screenshot_path.stat().st_size
-            if file_size == 0:
-                logger.warning("缓存文件大小为0，重新获取")
-                screenshot_path.unlink()
-                return None
-            
             file_age = time.time() - screenshot_path.stat().st_mtime
-            if file_age < 1800:  # 30分钟缓存
+            if file_age < self.SCREENSHOT_TTL and not self._crossed_daily_reset(screenshot_path):
                 logger.info("使用有效的缓存截图")
                 return screenshot_path
             else:
+                # 保留过期截图，刷新期间仍可作为旧数据返回
                 logger.info("缓存已过期，重新获取")
-                screenshot_path.unlink()
                 return None
                 
         except Exception as e:
             logger.warning(f"检查缓存时发生错误: {e}")
             return None
 
+    def _get_stale_screenshot(self) -> Optional[Path]:
+        """获取最新的每日密码文件(截图或文本记录)，不检查是否过期"""
+        latest, latest_mtime = None, 0.0
+        for path in self._daily_password_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_size > 0 and stat.st_mtime > latest_mtime:
+                latest, latest_mtime = path, stat.st_mtime
+        return latest
+
+    def _last_daily_reset(self, now: datetime) -> datetime:
+        """计算最近一次每日重置时间(北京时间，含网站更新延迟)"""
+        reset = now.replace(hour=self.daily_reset_hour, minute=0, second=0, microsecond=0)
+        reset += timedelta(minutes=self.daily_reset_delay)
+        if reset > now:
+            reset -= timedelta(days=1)
+        return reset
+
+    def _crossed_daily_reset(self, screenshot_path: Path) -> bool:
+        """判断截图是否早于最近一次每日重置"""
+        now = datetime.now(SHANGHAI_TZ)
+        captured_at = datetime.fromtimestamp(screenshot_path.stat().st_mtime, SHANGHAI_TZ)
+        return captured_at < self._last_daily_reset(now)
+
+    def _seconds_until_next_refresh(self) -> float:
+        """计算距离下一次预热刷新的秒数：缓存即将过期或每日重置之后，取较早者"""
+        now = datetime.now(SHANGHAI_TZ)
+        next_reset = self._last_daily_reset(now) + timedelta(days=1)
+        delay = (next_reset - now).total_seconds()
+        
+        screenshot_path = self._get_stale_screenshot()
+        if screenshot_path is None or self._crossed_daily_reset(screenshot_path):
+            return 0
+        
+        file_age = time.time() - screenshot_path.stat().st_mtime
+        return max(0, min(delay, self.SCREENSHOT_TTL - self.PREWARM_MARGIN - file_age))
+
+    async def _prewarm_loop(self):
+        """后台定时预热每日密码缓存"""
+        while True:
+            try:
+                if self.capture_breaker.is_open:
+                    # 熔断期间不访问网站，等待冷却结束
+                    await asyncio.sleep(self.capture_breaker.remaining())
+                    continue
+                
+                delay = self._seconds_until_next_refresh()
+                if delay > 0:
+                    logger.info(f"每日密码将在 {delay:.0f} 秒后预热刷新")
+                    await asyncio.sleep(delay)
+                
+                screenshot_path = await asyncio.shield(self._start_capture(force=True))
+                if screenshot_path is None:
+                    await asyncio.sleep(self.PREWARM_RETRY_DELAY)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"预热每日密码失败: {e}")
+                await asyncio.sleep(self.PREWARM_RETRY_DELAY)
+
     async def _add_gun(self, event: AstrMessageEvent, gun_name: str):
         """添加枪械"""
         if not gun_name:
             yield event.plain_result("❌请提供枪械名称")
             return
         
-        if self.datamanager.add_gun(gun_name):
+        if await self.datamanager.add_gun(gun_name):
             yield event.plain_result(f"✅成功添加枪械: {gun_name}")
         else:
             yield event.plain_result(f"❌添加枪械失败: {gun_name} 可能已存在")
@@ -555,7 +1087,7 @@ class yunsdf(Star):
             yield event.plain_result("❌请提供枪械名称")
             return
         
-        if self.datamanager.delete_gun(gun_name):
+        if await self.datamanager.delete_gun(gun_name):
             yield event.plain_result(f"✅成功删除枪械: {gun_name}")
         else:
             yield event.plain_result(f"❌删除枪械失败: {gun_name} 不存在")
@@ -569,40 +1101,153 @@ class yunsdf(Star):
             async for result in self._list_guns(event):
                 yield result
 
-    async def _list_guns(self, event: AstrMessageEvent):
-        """列出所有枪械"""
-        guns = self.datamanager.get_gun_list()
+    def _parse_page(self, page_str: Optional[str]) -> Optional[int]:
+        """
+        解析页码参数，未提供时为第1页
+        
+        Returns:
+            页码，格式错误时返回None
+        """
+        if page_str is None:
+            return 1
+        try:
+            return int(page_str)
+        except ValueError:
+            return None
+
+    async def _list_guns(self, event: AstrMessageEvent, page_str: str = None):
+        """分页列出所有枪械"""
+        page_num = self._parse_page(page_str)
+        if page_num is None:
+            yield event.plain_result("❌页码必须是数字")
+            return
+        
+        guns = self.datamanager.get_gun_order()
         if not guns:
             yield event.plain_result("❌暂无枪械数据")
             return
         
-        result = "欢迎使用Yun's三角洲插件\n 🔫 所有枪械列表:\n|序号|名称|烽火地带|全面战场\n"
-        for i, gun_name in enumerate(guns, 1):
-            gun_data = self.datamanager.get_gun(gun_name)
-            firezone_count = len(gun_data.get("firezone", {}))
-            battlefield_count = len(gun_data.get("battlefield", {}))
-            result += f"{i}. {gun_name} (🔥{firezone_count} ⚔️{battlefield_count})\n"
+        page = paginate(guns, page_num, self.list_page_size)
+        # 本页内容只取决于枪械顺序和本页枪械的版本号
+        version = (
+            self.datamanager.catalog_version,
+            self.list_page_size,
+            tuple(self.datamanager.get_gun_version(name) for name in page.items),
+        )
+        result = self._page_cache.get(("list", page.number), version)
+        if result is None:
+            self.metrics.inc("cache_requests", cache="gun_list", result="miss")
+            lines = [
+                "欢迎使用Yun's三角洲插件",
+                f" 🔫 所有枪械列表 (第{page.number}/{page.pages}页，共{page.total}把):",
+                "|序号|名称|烽火地带|全面战场",
+            ]
+            for i, gun_name in enumerate(page.items, page.start + 1):
+                gun_data = self.datamanager.get_gun(gun_name)
+                firezone_count = len(gun_data.get("firezone", {}))
+                battlefield_count = len(gun_data.get("battlefield", {}))
+                lines.append(f"{i}. {gun_name} (🔥{firezone_count} ⚔️{battlefield_count})")
+            if page.pages > 1:
+                lines.append("发送 /改枪码管理 枪械列表 <页码> 查看其他页")
+            result = "\n".join(lines)
+            self._page_cache.put(("list", page.number), version, result)
+        else:
+            self.metrics.inc("cache_requests", cache="gun_list", result="hit")
         
         yield event.plain_result(result)
 
-    async def _search_guns(self, event: AstrMessageEvent, keyword: str):
-        """搜索枪械"""
+    async def _search_guns(self, event: AstrMessageEvent, keyword: str, page_str: str = None):
+        """分页搜索枪械"""
         if not keyword:
             yield event.plain_result("❌请提供搜索关键词")
             return
+        page_num = self._parse_page(page_str)
+        if page_num is None:
+            yield event.plain_result("❌页码必须是数字")
+            return
         
-        found_guns = self.datamanager.search_guns(keyword)
+        version = (self.datamanager.catalog_version, self.list_page_size)
+        found_guns = self._search_cache.get(keyword, version)
+        if found_guns is None:
+            found_guns = self.datamanager.search_guns(keyword)
+            self._search_cache.put(keyword, version, found_guns)
         if not found_guns:
             yield event.plain_result(f"❌未找到包含 '{keyword}' 的枪械")
             return
         
-        result = f"🔍 搜索 '{keyword}' 结果:\n"
-        for i, gun_name in enumerate(found_guns, 1):
-            result += f"{i}. {gun_name}\n"
+        page = paginate(found_guns, page_num, self.list_page_size)
+        result = self._page_cache.get(("search", keyword, page.number), version)
+        if result is None:
+            lines = [f"🔍 搜索 '{keyword}' 结果 (第{page.number}/{page.pages}页，共{page.total}个):"]
+            lines.extend(f"{i}. {gun_name}" for i, gun_name in enumerate(page.items, page.start + 1))
+            if page.pages > 1:
+                lines.append(f"发送 /改枪码管理 搜索 {keyword} <页码> 查看其他页")
+            result = "\n".join(lines)
+            self._page_cache.put(("search", keyword, page.number), version, result)
         
         yield event.plain_result(result)
 
+    @filter.command("三角洲状态")
+    @requires_data
+    async def plugin_status(self, event: AstrMessageEvent):
+        """查看插件运行指标(管理员)"""
+        if event.get_sender_id() not in self.admin_list:
+            yield event.plain_result("❌你没有权限使用此命令！")
+            return
+        
+        uptime = int(time.time() - self.metrics.started_at)
+        selection_stats = self.user_temp_data.stats()
+        lines = [
+            "📊 Yun's三角洲插件状态",
+            f"运行时间: {uptime // 3600}小时{uptime % 3600 // 60}分",
+            f"枪械数: {len(self.datamanager.get_gun_list())}",
+            f"启动耗时: {self._render_startup_timings()}",
+        ]
+        if self.browser_pool.first_start_seconds is not None:
+            lines.append(f"浏览器首次启动耗时: {self.browser_pool.first_start_seconds:.2f}秒")
+        lines += [
+            f"待选择记录: {selection_stats['live']} (淘汰{selection_stats['evictions']} 过期{selection_stats['expirations']})",
+        ]
+        
+        hits = self.metrics.get_counter("cache_requests", cache="daily_password", result="hit")
+        stale = self.metrics.get_counter("cache_requests", cache="daily_password", result="stale")
+        misses = self.metrics.get_counter("cache_requests", cache="daily_password", result="miss")
+        total = hits + stale + misses
+        if total:
+            lines.append(f"每日密码缓存命中率: {(hits + stale) / total:.1%}")
+        breaker = self.capture_breaker
+        if breaker.trips:
+            state = {"closed": "正常", "open": f"熔断中(剩余{breaker.remaining():.0f}秒)", "half_open": "等待试探"}[breaker.state]
+            lines.append(f"每日密码获取: {state}，累计熔断{breaker.trips}次")
+        ready = self.metrics.histograms.get("capture_ready_seconds", {})
+        fast, full = ready.get((("mode", "fast"),)), ready.get((("mode", "full"),))
+        if fast is not None and full is not None and fast.count and full.count:
+            fast_avg, full_avg = fast.sum / fast.count, full.sum / full.count
+            lines.append(
+                f"截图加速: 页面就绪平均 {full_avg:.2f}秒 -> {fast_avg:.2f}秒，"
+                f"每次节省 {full_avg - fast_avg:.2f}秒 ({full.count}/{fast.count}次)"
+            )
+        if self._last_encoded is not None:
+            encoded = self._last_encoded
+            lines.append(
+                f"最近截图: {encoded.raw_size / 1024:.1f}KB -> {encoded.format.upper()} "
+                f"{len(encoded.data) / 1024:.1f}KB (节省 {encoded.saved / max(1, encoded.raw_size):.1%})"
+            )
+        
+        lines.extend(self.metrics.render_text())
+        if self.metrics_file is not None:
+            self.metrics.write_prometheus(self.metrics_file)
+            lines.append(f"Prometheus 指标文件: {self.metrics_file}")
+        yield event.plain_result("\n".join(lines))
+
+    async def _metrics_loop(self):
+        """定期写入 Prometheus 指标文件"""
+        while True:
+            await asyncio.sleep(self.METRICS_WRITE_INTERVAL)
+            self.metrics.write_prometheus(self.metrics_file)
+
     @filter.command("三角洲帮助")
+    @rate_limited("三角洲帮助")
     async def guncode_help(self, event: AstrMessageEvent):
         """改枪码帮助"""
         help_text = (
@@ -613,20 +1258,23 @@ class yunsdf(Star):
             "• /改枪码帮助 - 显示此帮助\n\n"
             "管理员命令:\n"
             "• /改枪码管理 - 显示管理命令帮助\n"
+            "• /三角洲状态 - 查看插件运行指标\n"
             "• /改枪码管理 添加枪械 <枪名>\n"
             "• /改枪码管理 删除枪械 <枪名>\n"
             "• /改枪码管理 添加代码 <枪名> <烽火地带|全面战场> <代码> <描述> [价格]\n"
             "• /改枪码管理 删除代码 <枪名> <烽火地带|全面战场> <序号>\n"
             "• /改枪码管理 查看枪械 [枪名]\n"
-            "• /改枪码管理 枪械列表\n"
-            "• /改枪码管理 搜索 <关键词>"
+            "• /改枪码管理 枪械列表 [页码]\n"
+            "• /改枪码管理 搜索 <关键词> [页码]\n"
+            "• /改枪码管理 导入 <文件名>\n"
+            "• /改枪码管理 导出 <文件名>"
         )
         yield event.plain_result(help_text)
 
     def _set_user_temp_data(self, user_id: str, group_id: str, data):
         """设置用户临时数据"""
         key = f"{user_id}_{group_id}"
-        self.user_temp_data[key] = data
+        self.user_temp_data.set(key, data)
 
     def _get_user_temp_data(self, user_id: str, group_id: str):
         """获取用户临时数据"""
@@ -636,14 +1284,27 @@ class yunsdf(Star):
     def _clear_user_temp_data(self, user_id: str, group_id: str):
         """清除用户临时数据"""
         key = f"{user_id}_{group_id}"
-        if key in self.user_temp_data:
-            del self.user_temp_data[key]
+        self.user_temp_data.pop(key)
 
     async def terminate(self):
         """插件销毁"""
+        if self._ready_task is not None and not self._ready_task.done():
+            # 数据仍在加载，等待加载完成后再正常关闭
+            await self._ready_task
+        if self.datamanager is not None:
+            await self.datamanager.close()
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self.metrics.write_prometheus(self.metrics_file)
+        if self._capture_task is not None and not self._capture_task.done():
+            self._capture_task.cancel()
+        await self.browser_pool.close()
+        self.user_temp_data.stop_sweeper()
         self.user_temp_data.clear()
         current_time = time.time()
-        for file in self.screenshot_dir.glob("*.png"):
+        for file in [*self.screenshot_dir.glob("*.png"), *self.screenshot_dir.glob("*.json")]:
             if current_time - file.stat().st_mtime > 86400:
                 file.unlink()
         logger.info("改枪码插件已卸载")
\ No newline at end of file
@@ -0,0 +1,193 @@
+from astrbot.api import logger
+import functools
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 标签以排序后的 (键, 值) 元组存储，便于作为字典键
+Labels = Tuple[Tuple[str, str], ...]
+
+# 直方图的桶上限(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """固定桶的延迟直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """记录一次观测值"""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """根据桶估算分位数，返回所在桶的上限"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bound in enumerate(self.buckets):
+            seen += self.counts[i]
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    插件运行指标：延迟直方图与计数器
+    可渲染为状态文本或 Prometheus 文本格式
+    """
+
+    PREFIX = "yunsdf"
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """
+        记录一次耗时
+        
+        Args:
+            name: 指标名称
+            seconds: 耗时(秒)
+            labels: 标签
+        """
+        series = self.histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        增加计数器
+        
+        Args:
+            name: 指标名称
+            value: 增加量
+            labels: 标签
+        """
+        series = self.counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """读取计数器的值"""
+        return self.counters.get(name, {}).get(_labels(labels), 0)
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Optional[Labels] = None) -> str:
+        items = list(labels) + list(extra or ())
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+    def render_text(self) -> List[str]:
+        """
+        渲染为便于在聊天中阅读的文本行
+        
+        Returns:
+            文本行列表
+        """
+        lines = []
+        for name, series in sorted(self.histograms.items()):
+            for labels, h in sorted(series.items()):
+                label_text = ",".join(v for _, v in labels)
+                title = f"{name}[{label_text}]" if label_text else name
+                avg = h.sum / h.count if h.count else 0
+                lines.append(
+                    f"{title}: {h.count}次 平均{avg * 1000:.0f}ms "
+                    f"p50≤{h.quantile(0.5) * 1000:.0f}ms p95≤{h.quantile(0.95) * 1000:.0f}ms "
+                    f"最大{h.max * 1000:.0f}ms"
+                )
+        for name, series in sorted(self.counters.items()):
+            for labels, value in sorted(series.items()):
+                label_text = ",".join(v for _, v in labels)
+                title = f"{name}[{label_text}]" if label_text else name
+                lines.append(f"{title}: {value:g}")
+        return lines
+
+    def render_prometheus(self) -> str:
+        """
+        渲染为 Prometheus 文本格式
+        
+        Returns:
+            指标文本
+        """
+        lines = [
+            f"# TYPE {self.PREFIX}_uptime_seconds gauge",
+            f"{self.PREFIX}_uptime_seconds {time.time() - self.started_at:.0f}",
+        ]
+        for name, series in sorted(self.histograms.items()):
+            metric = f"{self.PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, h in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{metric}_sum{self._format_labels(labels)} {h.sum:.6f}")
+                lines.append(f"{metric}_count{self._format_labels(labels)} {h.count}")
+        for name, series in sorted(self.counters.items()):
+            metric = f"{self.PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{metric}{self._format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """
+        原子写入 Prometheus 文本格式文件，供 node_exporter textfile 等采集
+        
+        Args:
+            path: 文件路径
+        """
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            tmp_path.write_text(self.render_prometheus(), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入指标文件失败: {e}")
+
+
+def timed_handler(command: str):
+    """
+    统计命令处理耗时的装饰器，用于 yield 结果的异步生成器处理函数
+    耗时记录到实例的 metrics 中，指标名为 command_seconds
+    
+    Args:
+        command: 命令名称，作为 command 标签
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                async for result in func(self, *args, **kwargs):
+                    yield result
+            finally:
+                self.metrics.observe("command_seconds", time.perf_counter() - start, command=command)
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from typing import Any, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Page(NamedTuple):
+    """列表中的一页"""
+    items: List[Any]
+    number: int
+    pages: int
+    total: int
+    start: int
+
+
+def paginate(items: Sequence[Any], page: int, page_size: int) -> Page:
+    """
+    截取列表中的一页，页码超出范围时取最近的有效页
+
+    Args:
+        items: 完整列表
+        page: 页码，从1开始
+        page_size: 每页条目数
+
+    Returns:
+        对应的页
+    """
+    page_size = max(1, page_size)
+    total = len(items)
+    pages = max(1, (total + page_size - 1) // page_size)
+    number = min(max(1, page), pages)
+    start = (number - 1) * page_size
+    return Page(list(items[start:start + page_size]), number, pages, total, start)
+
+
+class VersionedCache:
+    """
+    带版本号的 LRU 缓存
+    读取时版本号不一致视为未命中，超过容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Args:
+            max_entries: 最大条目数
+        """
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        读取条目
+
+        Args:
+            key: 条目键
+            version: 期望的版本号
+
+        Returns:
+            版本号一致时返回缓存值，否则返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """
+        写入条目
+
+        Args:
+            key: 条目键
+            version: 版本号
+            value: 缓存值
+        """
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """移除条目，不存在时忽略"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
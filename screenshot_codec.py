@@ -0,0 +1,124 @@
+from astrbot.api import logger
+from collections import OrderedDict
+import hashlib
+import io
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    # 未安装 Pillow 时不重新编码，直接使用原始 PNG
+    PILImage = None
+
+
+class EncodedScreenshot(NamedTuple):
+    """重新编码后的截图"""
+    digest: str
+    data: bytes
+    format: str
+    raw_size: int
+
+    @property
+    def saved(self) -> int:
+        """相比原始截图节省的字节数"""
+        return self.raw_size - len(self.data)
+
+
+class ScreenshotEncoder:
+    """
+    截图的压缩与去重
+    截图重新编码为体积更小的格式后按内容哈希缓存在内存中，
+    内容未变化的截图直接复用已编码的数据，发送时无需再读取文件
+    """
+
+    FORMATS = ("jpeg", "webp", "png")
+
+    def __init__(self, fmt: str = "jpeg", quality: int = 80, max_entries: int = 8):
+        """
+        Args:
+            fmt: 目标格式，'jpeg'、'webp' 或 'png'
+            quality: 有损格式的编码质量(1-100)
+            max_entries: 内存中最多保留的编码结果数
+        """
+        if fmt not in self.FORMATS:
+            logger.warning(f"不支持的截图格式 {fmt}，使用 jpeg")
+            fmt = "jpeg"
+        self.format = fmt
+        self.quality = min(max(1, quality), 100)
+        self.max_entries = max(1, max_entries)
+        # 原始截图哈希 -> 编码结果
+        self._encoded: "OrderedDict[str, EncodedScreenshot]" = OrderedDict()
+        # 文件 (路径, 修改时间, 大小) -> 原始截图哈希
+        self._files: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        if PILImage is None and fmt != "png":
+            logger.warning("未安装 Pillow，截图将以原始 PNG 格式发送")
+
+    def get(self, path: Path) -> Optional[EncodedScreenshot]:
+        """
+        获取文件已缓存的编码结果，不读取文件
+
+        Args:
+            path: 截图路径
+
+        Returns:
+            编码结果，未缓存或文件已变化时返回None
+        """
+        try:
+            key = self._file_key(path)
+        except OSError:
+            return None
+        source_digest = self._files.get(key)
+        if source_digest is None:
+            return None
+        return self._encoded.get(source_digest)
+
+    def encode_file(self, path: Path) -> Tuple[EncodedScreenshot, bool]:
+        """
+        读取并编码截图文件，内容与已缓存的截图相同时直接复用
+
+        Args:
+            path: 截图路径
+
+        Returns:
+            (编码结果, 是否复用了已有的编码结果)
+        """
+        key = self._file_key(path)
+        raw = path.read_bytes()
+        source_digest = hashlib.sha256(raw).hexdigest()
+
+        encoded = self._encoded.get(source_digest)
+        reused = encoded is not None
+        if encoded is None:
+            encoded = self._encode(raw)
+        self._remember(self._encoded, source_digest, encoded)
+        self._remember(self._files, key, source_digest)
+        return encoded, reused
+
+    def _encode(self, raw: bytes) -> EncodedScreenshot:
+        """将 PNG 截图重新编码为目标格式，结果更大或编码失败时保留原图"""
+        data, fmt = raw, "png"
+        if PILImage is not None:
+            try:
+                with PILImage.open(io.BytesIO(raw)) as image:
+                    if self.format == "jpeg":
+                        image = image.convert("RGB")
+                    out = io.BytesIO()
+                    image.save(out, format=self.format.upper(), quality=self.quality, optimize=True)
+                if out.tell() < len(raw):
+                    data, fmt = out.getvalue(), self.format
+            except Exception as e:
+                logger.warning(f"截图重新编码失败，使用原始 PNG: {e}")
+        return EncodedScreenshot(hashlib.sha256(data).hexdigest(), data, fmt, len(raw))
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        """写入 LRU 缓存并淘汰最久未使用的条目"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def _file_key(path: Path) -> Tuple[str, int, int]:
+        stat = path.stat()
+        return str(path), stat.st_mtime_ns, stat.st_size
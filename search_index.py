@@ -0,0 +1,220 @@
+import re
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 模糊搜索时忽略的分隔符，使 "ak47" 能匹配 "AK-47"
+_SEPARATORS = re.compile(r"[\s\-_·.]+")
+
+
+def normalize(text: str) -> str:
+    """转为小写并去除分隔符"""
+    return _SEPARATORS.sub("", text.lower())
+
+
+def substring_edit_distance(pattern: str, text: str) -> int:
+    """
+    计算 pattern 与 text 中任意子串之间的最小编辑距离
+    
+    Args:
+        pattern: 查询词
+        text: 被搜索的文本
+        
+    Returns:
+        最小编辑距离
+    """
+    if not pattern:
+        return 0
+    # prev[j]: pattern[:i] 与以 text[j-1] 结尾的子串的最小距离，子串起点不计代价
+    prev = [0] * (len(text) + 1)
+    for i, p_char in enumerate(pattern, 1):
+        curr = [i] + [0] * len(text)
+        for j, t_char in enumerate(text, 1):
+            curr[j] = min(
+                prev[j - 1] + (p_char != t_char),
+                prev[j] + 1,
+                curr[j - 1] + 1,
+            )
+        prev = curr
+    return min(prev)
+
+
+class GunSearchIndex:
+    """
+    枪名的字符 n-gram 倒排索引
+    查询时先用 n-gram 倒排表求交集缩小候选范围，再做子串校验，
+    结果与逐个子串匹配完全一致，并保持枪械的插入顺序
+
+    同一份倒排表也用于容错搜索：按共有 n-gram 数量选出候选，
+    再以子串编辑距离排序
+    """
+
+    def __init__(self, names: Iterable[str] = (), n: int = 2):
+        """
+        初始化索引
+        
+        Args:
+            names: 初始枪名列表
+            n: n-gram 长度，短于 n 的关键词使用单字索引
+        """
+        self.n = max(1, n)
+        self._postings: Dict[str, Set[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._seq = 0
+        for name in names:
+            self.add(name)
+
+    def _ngrams(self, text: str) -> Set[str]:
+        """生成文本的 n-gram 集合"""
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def _grams(self, text: str) -> Set[str]:
+        """生成枪名的索引项：单字、n-gram 以及去除分隔符后的 n-gram"""
+        grams = set(text)
+        if self.n > 1:
+            grams.update(self._ngrams(text))
+            grams.update(self._ngrams(normalize(text)))
+        return grams
+
+    def add(self, name: str) -> None:
+        """
+        添加枪名，已存在时移动到末尾，与字典重新插入的顺序一致
+        
+        Args:
+            name: 枪械名称
+        """
+        if name in self._order:
+            self.remove(name)
+        
+        self._seq += 1
+        self._order[name] = self._seq
+        for gram in self._grams(name.lower()):
+            self._postings.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str) -> None:
+        """
+        移除枪名
+        
+        Args:
+            name: 枪械名称
+        """
+        if self._order.pop(name, None) is None:
+            return
+        
+        for gram in self._grams(name.lower()):
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(name)
+            if not posting:
+                del self._postings[gram]
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """
+        重命名枪名
+        
+        Args:
+            old_name: 原名称
+            new_name: 新名称
+        """
+        self.remove(old_name)
+        self.add(new_name)
+
+    def search(self, keyword: str) -> List[str]:
+        """
+        查找名称包含关键词(不区分大小写)的枪名
+        
+        Args:
+            keyword: 关键词
+            
+        Returns:
+            按插入顺序排列的匹配枪名列表
+        """
+        keyword_lower = keyword.lower()
+        if not keyword_lower:
+            return list(self._order)
+        
+        if len(keyword_lower) < self.n:
+            grams = set(keyword_lower)
+        else:
+            grams = self._ngrams(keyword_lower)
+        
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+        
+        result = [name for name in candidates if keyword_lower in name.lower()]
+        result.sort(key=self._order.__getitem__)
+        return result
+
+    def fuzzy_search(self, keyword: str, limit: int = 5, max_candidates: int = 200,
+                     budget: float = 0.05) -> List[Tuple[str, float]]:
+        """
+        容错搜索，返回按相似度排序的前 limit 个枪名
+        
+        Args:
+            keyword: 关键词
+            limit: 返回结果数量
+            max_candidates: 参与编辑距离计算的最大候选数
+            budget: 时间预算(秒)，超时后返回已计算的结果
+            
+        Returns:
+            [(枪名, 相似度), ...]，相似度范围 0~1
+        """
+        deadline = time.perf_counter() + budget
+        query = normalize(keyword)
+        if len(query) < self.n:
+            return []
+        
+        # 统计每个枪名与查询共有的 n-gram 数量
+        overlaps: Dict[str, int] = {}
+        for gram in self._ngrams(query):
+            for name in self._postings.get(gram, ()):
+                overlaps[name] = overlaps.get(name, 0) + 1
+            if time.perf_counter() > deadline:
+                break
+        
+        candidates = sorted(overlaps.items(), key=lambda item: (-item[1], len(item[0])))[:max_candidates]
+        
+        # 编辑距离超过查询长度 40% 的视为不相关
+        max_distance = max(1, len(query) * 2 // 5)
+        scored = []
+        for name, overlap in candidates:
+            distance = substring_edit_distance(query, normalize(name))
+            if distance <= max_distance:
+                scored.append((name, 1 - distance / len(query), overlap))
+            if time.perf_counter() > deadline:
+                break
+        
+        scored.sort(key=lambda item: (-item[1], -item[2], len(item[0]), self._order[item[0]]))
+        return [(name, score) for name, score, _ in scored[:limit]]
+
+    def rank(self, keyword: str, names: List[str]) -> List[str]:
+        """
+        对子串匹配结果排序：完全相同 > 前缀匹配 > 名称更短
+        
+        Args:
+            keyword: 关键词
+            names: 匹配的枪名
+            
+        Returns:
+            排序后的枪名列表
+        """
+        keyword_lower = keyword.lower()
+        return sorted(names, key=lambda name: (
+            name.lower() != keyword_lower,
+            not name.lower().startswith(keyword_lower),
+            len(name),
+        ))
+
+    def __len__(self) -> int:
+        return len(self._order)
@@ -0,0 +1,133 @@
+from astrbot.api import logger
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class SelectionStore:
+    """
+    待选择枪械的临时存储
+    每个条目有存活时间，超过容量上限时淘汰最久未使用的条目，
+    后台清理任务定期移除过期条目
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1000, sweep_interval: float = 60):
+        """
+        初始化存储
+        
+        Args:
+            ttl: 条目存活时间(秒)
+            max_entries: 最大条目数
+            sweep_interval: 后台清理间隔(秒)
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.expirations = 0
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        写入条目，超过容量时淘汰最久未使用的条目
+        
+        Args:
+            key: 条目键
+            value: 条目数据
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Any:
+        """
+        读取条目，过期条目视为不存在
+        
+        Args:
+            key: 条目键
+            
+        Returns:
+            条目数据或None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+
+    def pop(self, key: str) -> Any:
+        """
+        移除并返回条目
+        
+        Args:
+            key: 条目键
+            
+        Returns:
+            条目数据或None
+        """
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def sweep(self) -> int:
+        """
+        移除所有过期条目
+        
+        Returns:
+            移除的条目数
+        """
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        """后台定期清理过期条目"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"已清理 {removed} 条过期的待选择记录")
+
+    def start_sweeper(self) -> None:
+        """启动后台清理任务"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    def stop_sweeper(self) -> None:
+        """停止后台清理任务"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def clear(self) -> None:
+        """清空所有条目"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        获取统计数据
+        
+        Returns:
+            包含当前条目数、淘汰数和过期数的字典
+        """
+        return {
+            "live": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
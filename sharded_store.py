@@ -0,0 +1,217 @@
+from astrbot.api import logger
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+
+class ShardedStore:
+    """
+    分片存储后端
+    目录下的 index.json 只记录枪名顺序和分片数，枪械数据按枪名哈希分散到 bucket_XXX.json，
+    分片按需加载并以 LRU 方式缓存，修改后只重写受影响的分片
+    """
+
+    INDEX_FILE = "index.json"
+    DEFAULT_BUCKETS = 256
+
+    def __init__(self, root: Union[str, Path], cache_size: int = 32):
+        """
+        Args:
+            root: 分片目录
+            cache_size: 内存中最多缓存的分片数，未保存的分片不会被淘汰
+        """
+        self.root = Path(root)
+        self.cache_size = max(1, cache_size)
+        self.buckets = self.DEFAULT_BUCKETS
+        self._cache: "OrderedDict[int, Dict]" = OrderedDict()
+        self._dirty_buckets = set()
+        self._index_dirty = False
+        self._order: Dict[str, None] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def index_file(self) -> Path:
+        return self.root / self.INDEX_FILE
+
+    def exists(self) -> bool:
+        """分片目录是否已创建"""
+        return self.index_file.exists()
+
+    def bucket_of(self, name: str) -> int:
+        """计算枪名所在的分片编号"""
+        return zlib.crc32(name.encode('utf-8')) % self.buckets
+
+    def _bucket_file(self, bucket: int) -> Path:
+        return self.root / f"bucket_{bucket:03d}.json"
+
+    def _write_json(self, path: Path, obj) -> None:
+        """原子写入 JSON 文件"""
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(obj, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def create(self, data: Dict) -> None:
+        """
+        用完整数据创建分片目录(迁移或从模板重建时使用)，会覆盖已有分片
+        
+        Args:
+            data: 与 JSON 数据文件结构一致的数据字典
+        """
+        guns = data.get("guns", {})
+        self.root.mkdir(parents=True, exist_ok=True)
+        
+        buckets: Dict[int, Dict] = {}
+        for name, gun in guns.items():
+            buckets.setdefault(self.bucket_of(name), {})[name] = gun
+        
+        with self._lock:
+            for bucket in range(self.buckets):
+                path = self._bucket_file(bucket)
+                if bucket in buckets:
+                    self._write_json(path, buckets[bucket])
+                elif path.exists():
+                    path.unlink()
+            self._write_json(self.index_file, {"buckets": self.buckets, "guns": list(guns)})
+            self._cache.clear()
+            self._dirty_buckets.clear()
+            self._index_dirty = False
+        logger.info(f"已创建 {len(buckets)} 个分片，共 {len(guns)} 把枪械: {self.root}")
+
+    def open(self) -> "ShardedGunMap":
+        """
+        读取分片索引
+        
+        Returns:
+            按需加载分片的枪械映射
+        """
+        with self.index_file.open('r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.buckets = index.get("buckets", self.DEFAULT_BUCKETS)
+        self._order = dict.fromkeys(index.get("guns", []))
+        return ShardedGunMap(self)
+
+    def load_bucket(self, bucket: int) -> Dict:
+        """
+        获取分片数据，未缓存时从文件加载
+        
+        Args:
+            bucket: 分片编号
+            
+        Returns:
+            分片内的 {枪名: 枪械数据}
+        """
+        with self._lock:
+            data = self._cache.get(bucket)
+            if data is not None:
+                self._cache.move_to_end(bucket)
+                return data
+            
+            path = self._bucket_file(bucket)
+            if path.exists():
+                with path.open('r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = {}
+            self._cache[bucket] = data
+            self._evict(keep=bucket)
+            return data
+
+    def _evict(self, keep: int = -1) -> None:
+        """
+        淘汰超出容量的已保存分片
+        
+        Args:
+            keep: 不淘汰的分片编号，即刚被请求、调用方即将修改的分片
+        """
+        for bucket in list(self._cache):
+            if len(self._cache) <= self.cache_size:
+                break
+            if bucket != keep and bucket not in self._dirty_buckets:
+                del self._cache[bucket]
+
+    def mark_dirty(self, name: str, index_changed: bool = False) -> None:
+        """
+        标记枪械所在的分片需要保存
+        
+        Args:
+            name: 枪械名称
+            index_changed: 枪名列表是否发生变化
+        """
+        with self._lock:
+            self._dirty_buckets.add(self.bucket_of(name))
+            if index_changed:
+                self._index_dirty = True
+
+    def flush(self) -> None:
+        """写入所有已修改的分片，最后写入索引"""
+        with self._lock:
+            for bucket in sorted(self._dirty_buckets):
+                self._write_json(self._bucket_file(bucket), self._cache[bucket])
+            written = len(self._dirty_buckets)
+            self._dirty_buckets.clear()
+            if self._index_dirty:
+                self._write_json(self.index_file, {"buckets": self.buckets, "guns": list(self._order)})
+                self._index_dirty = False
+            self._evict()
+        if written:
+            logger.debug(f"已写入 {written} 个分片")
+
+    def cached_buckets(self) -> int:
+        """当前缓存的分片数"""
+        return len(self._cache)
+
+
+class ShardedGunMap(MutableMapping):
+    """
+    data["guns"] 在分片模式下的替代品
+    枪名列表常驻内存，枪械数据在访问时才加载所在的分片
+    """
+
+    def __init__(self, store: ShardedStore):
+        self._store = store
+
+    def __getitem__(self, name: str) -> Dict:
+        if name not in self._store._order:
+            raise KeyError(name)
+        return self._store.load_bucket(self._store.bucket_of(name))[name]
+
+    def __setitem__(self, name: str, gun: Dict) -> None:
+        self._store.load_bucket(self._store.bucket_of(name))[name] = gun
+        is_new = name not in self._store._order
+        self._store._order[name] = None
+        self._store.mark_dirty(name, index_changed=is_new)
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self._store._order:
+            raise KeyError(name)
+        self._store.load_bucket(self._store.bucket_of(name)).pop(name, None)
+        del self._store._order[name]
+        self._store.mark_dirty(name, index_changed=True)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._store._order
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._order)
+
+    def __len__(self) -> int:
+        return len(self._store._order)
+
+    def keys(self):
+        return self._store._order.keys()
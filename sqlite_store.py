@@ -0,0 +1,261 @@
+from astrbot.api import logger
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+class SqliteStore:
+    """
+    基于 SQLite 的改枪码存储后端
+    每条修改记录转换为对应的 SQL 语句单独提交，不再重写整个数据文件；
+    写入在 BEGIN IMMEDIATE 事务中进行，并通过 PRAGMA data_version 检查数据库是否已被其他连接修改，
+    新增的代码序号已被其他实例占用时在事务内顺延
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS guns (
+        name TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        meta TEXT
+    );
+    CREATE TABLE IF NOT EXISTS codes (
+        gun TEXT NOT NULL,
+        field TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        code TEXT NOT NULL,
+        description TEXT NOT NULL,
+        price INTEGER,
+        extra TEXT,
+        PRIMARY KEY (gun, field, level)
+    );
+    CREATE INDEX IF NOT EXISTS idx_guns_seq ON guns (seq);
+    CREATE INDEX IF NOT EXISTS idx_codes_field_price ON codes (field, price);
+    """
+
+    # codes 表中单独成列的字段，其余字段存入 extra
+    CODE_COLUMNS = ("code", "description", "price")
+    # 枪械数据中按字段类型存放代码的键，其余键存入 guns.meta
+    FIELD_TYPES = ("firezone", "battlefield")
+    # 完成首次迁移后写入的 user_version
+    MIGRATED_VERSION = 1
+
+    def __init__(self, db_file: Union[str, Path]):
+        """
+        打开数据库并创建表结构
+        
+        Args:
+            db_file: 数据库文件路径
+        """
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+        # 最近一次读取全部数据时的 data_version，其他连接提交修改后会变化
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """数据库中是否还没有任何枪械"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM guns LIMIT 1").fetchone() is None
+
+    @property
+    def migrated(self) -> bool:
+        """是否已完成首次迁移，记录在 PRAGMA user_version 中"""
+        with self._lock:
+            return self._conn.execute("PRAGMA user_version").fetchone()[0] >= self.MIGRATED_VERSION
+
+    def mark_migrated(self) -> None:
+        """记录已完成首次迁移，之后即使删光所有枪械也不会再次迁移"""
+        with self._lock:
+            self._conn.execute(f"PRAGMA user_version = {self.MIGRATED_VERSION}")
+
+    def load(self) -> Dict:
+        """
+        读取全部数据，结构与 JSON 数据文件一致
+        
+        Returns:
+            数据字典
+        """
+        guns = {}
+        with self._lock:
+            self._data_version = self._read_data_version()
+            for name, meta in self._conn.execute("SELECT name, meta FROM guns ORDER BY seq"):
+                guns[name] = self._row_to_gun(name, meta)
+            
+            rows = self._conn.execute(
+                "SELECT gun, field, level, code, description, price, extra FROM codes ORDER BY gun, field, level"
+            )
+            for gun, field, level, code, description, price, extra in rows:
+                if gun not in guns:
+                    continue
+                guns[gun].setdefault(field, {})[str(level)] = self._row_to_code(code, description, price, extra)
+        
+        return {"guns": guns}
+
+    @staticmethod
+    def _row_to_gun(name: str, meta) -> Dict:
+        """将一行 guns 记录还原为不含代码的枪械数据字典"""
+        gun = json.loads(meta) if meta else {"name": name}
+        gun["firezone"] = {}
+        gun["battlefield"] = {}
+        return gun
+
+    @classmethod
+    def _gun_meta(cls, name: str, gun: Dict):
+        """提取枪械的附加字段，与默认值 {"name": 枪名} 相同时返回 None"""
+        meta = {k: v for k, v in gun.items() if k not in cls.FIELD_TYPES}
+        if meta == {"name": name}:
+            return None
+        return json.dumps(meta, ensure_ascii=False)
+
+    @staticmethod
+    def _row_to_code(code: str, description: str, price, extra) -> Dict:
+        """将一行 codes 记录还原为代码数据字典"""
+        data = json.loads(extra) if extra else {}
+        data["code"] = code
+        data["description"] = description
+        if price is not None:
+            data["price"] = price
+        return data
+
+    @classmethod
+    def _code_to_row(cls, data: Dict) -> tuple:
+        """将代码数据字典拆分为 (code, description, price, extra)"""
+        extra = {k: v for k, v in data.items() if k not in cls.CODE_COLUMNS}
+        return (
+            data.get("code", ""),
+            data.get("description", ""),
+            data.get("price"),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def replace_all(self, data: Dict) -> None:
+        """
+        用给定数据替换数据库中的全部内容，在单个事务中完成
+        
+        Args:
+            data: 与 JSON 数据文件结构一致的数据字典
+        """
+        gun_rows = []
+        code_rows = []
+        for seq, (name, gun) in enumerate(data.get("guns", {}).items(), 1):
+            gun_rows.append((name, seq, self._gun_meta(name, gun)))
+            for field in self.FIELD_TYPES:
+                for level, code_data in gun.get(field, {}).items():
+                    code_rows.append((name, field, int(level), *self._code_to_row(code_data)))
+        
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM codes")
+            self._conn.execute("DELETE FROM guns")
+            self._conn.executemany("INSERT INTO guns (name, seq, meta) VALUES (?, ?, ?)", gun_rows)
+            self._conn.executemany(
+                "INSERT INTO codes (gun, field, level, code, description, price, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                code_rows
+            )
+        logger.info(f"已写入 {len(gun_rows)} 把枪械、{len(code_rows)} 条改枪码到数据库")
+
+    def apply(self, op: Dict) -> bool:
+        """
+        将一条修改记录写入数据库
+        
+        Args:
+            op: 修改记录，格式见 DataManager._apply_op
+            
+        Returns:
+            数据库在上次 load 之后是否已被其他连接修改
+        """
+        return self.apply_many([op])
+
+    def apply_many(self, ops: List[Dict]) -> bool:
+        """
+        在单个事务中写入多条修改记录
+        
+        Args:
+            ops: 修改记录列表
+            
+        Returns:
+            数据库在上次 load 之后是否已被其他连接修改，是则调用方应重新 load
+        """
+        with self._lock:
+            # 立即获取写锁，事务内读取的序号在提交前不会被其他连接修改
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stale = self._read_data_version() != self._data_version
+                for op in ops:
+                    self._execute(op)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            return stale
+
+    def _execute(self, op: Dict) -> None:
+        """在当前事务中执行一条修改记录对应的 SQL"""
+        action = op["op"]
+        gun_name = op["gun"]
+        
+        if action == "add_gun":
+            # 枪械可能已被其他实例添加，保留已有数据
+            self._conn.execute(
+                "INSERT OR IGNORE INTO guns (name, seq) "
+                "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM guns))",
+                (gun_name,)
+            )
+        elif action == "delete_gun":
+            self._conn.execute("DELETE FROM codes WHERE gun = ?", (gun_name,))
+            self._conn.execute("DELETE FROM guns WHERE name = ?", (gun_name,))
+        elif action == "rename_gun":
+            row = self._conn.execute("SELECT meta FROM guns WHERE name = ?", (gun_name,)).fetchone()
+            gun = self._row_to_gun(gun_name, row[0] if row else None)
+            gun["name"] = op["new"]
+            self._conn.execute(
+                "UPDATE guns SET name = ?, meta = ?, seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM guns) "
+                "WHERE name = ?",
+                (op["new"], self._gun_meta(op["new"], gun), gun_name)
+            )
+            self._conn.execute("UPDATE codes SET gun = ? WHERE gun = ?", (op["new"], gun_name))
+        elif action == "set_field":
+            if op.get("append"):
+                self._resolve_append_level(op)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO codes (gun, field, level, code, description, price, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (gun_name, op["field"], int(op["level"]), *self._code_to_row(op["data"]))
+            )
+        elif action == "delete_field":
+            self._conn.execute(
+                "DELETE FROM codes WHERE gun = ? AND field = ? AND level = ?",
+                (gun_name, op["field"], int(op["level"]))
+            )
+        else:
+            raise KeyError(f"未知的操作类型: {action}")
+
+    def _resolve_append_level(self, op: Dict) -> None:
+        """新增代码的序号已被其他实例占用时顺延到末尾，在写入事务中调用"""
+        taken = self._conn.execute(
+            "SELECT 1 FROM codes WHERE gun = ? AND field = ? AND level = ?",
+            (op["gun"], op["field"], int(op["level"]))
+        ).fetchone()
+        if taken is None:
+            return
+        new_level = self._conn.execute(
+            "SELECT MAX(level) + 1 FROM codes WHERE gun = ? AND field = ?",
+            (op["gun"], op["field"])
+        ).fetchone()[0]
+        logger.info(f"枪械 {op['gun']} 的 {op['field']} 等级 {op['level']} 已被其他实例占用，顺延为 {new_level}")
+        op["level"] = str(new_level)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
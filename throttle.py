@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class RateLimiter:
+    """
+    按键(用户、群)区分的令牌桶限流器
+    每个键的令牌以固定速率恢复，最多累积 burst 个；超过容量上限时淘汰最久未使用的键
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int = 10000):
+        """
+        Args:
+            per_minute: 每分钟恢复的令牌数，不大于0时不限流
+            burst: 令牌桶容量，即允许的连续请求数
+            max_keys: 最多记录的键数
+        """
+        self.rate = max(0.0, per_minute) / 60
+        self.burst = max(1, burst)
+        self.max_keys = max(1, max_keys)
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        """按经过的时间恢复令牌后的令牌数"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, updated_at = bucket
+        return min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+    def peek(self, key: Hashable) -> bool:
+        """是否还有可用令牌，不消耗令牌"""
+        return not self.enabled or self._tokens(key, time.monotonic()) >= 1
+
+    def consume(self, key: Hashable) -> None:
+        """消耗一个令牌"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        self._buckets[key] = (self._tokens(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def retry_after(self, key: Hashable) -> float:
+        """距离下一个令牌可用的秒数"""
+        if not self.enabled:
+            return 0.0
+        missing = 1 - self._tokens(key, time.monotonic())
+        return max(0.0, missing / self.rate)
+
+
+class ReplyCache:
+    """
+    短时间内相同查询的回复缓存
+    条目在存活时间内且版本号一致时命中，超过容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, ttl: float = 10, max_entries: int = 512):
+        """
+        Args:
+            ttl: 条目存活时间(秒)，不大于0时不缓存
+            max_entries: 最大条目数
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Hashable, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        读取条目
+
+        Args:
+            key: 查询键
+            version: 期望的数据版本号
+
+        Returns:
+            缓存的回复，未命中时返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, cached_version, value = entry
+        if expires_at <= time.monotonic() or cached_version != version:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """写入条目"""
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()